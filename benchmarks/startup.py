@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Замер времени запуска базы данных в режиме однократной команды (database -c).
+
+Каждая команда запускается в отдельном процессе во временной директории, как
+это делают скрипты и cron-задачи. Для сравнения замеряется запуск пустого
+интерпретатора Python.
+
+Запуск: python benchmarks/startup.py [-n КОЛИЧЕСТВО_ЗАПУСКОВ]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = (
+    "list_tables",
+    'insert into bench values ("Alice", 28)',
+    "select from bench where ID = 1",
+)
+
+
+def _measure(args: list[str], cwd: str, runs: int) -> list[float]:
+    """Запускает процесс runs раз и возвращает время каждого запуска в мс."""
+    env = os.environ | {"PYTHONPATH": PROJECT_ROOT}
+    timings = []
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run(
+            args,
+            cwd=cwd,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return timings
+
+
+def _report(name: str, timings: list[float]):
+    """Печатает минимальное, медианное и среднее время."""
+    print(
+        f"{name:<45} min {min(timings):7.1f} мс   "
+        f"median {statistics.median(timings):7.1f} мс   "
+        f"mean {statistics.mean(timings):7.1f} мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    database = [sys.executable, "-m", "src.primitive_db.main", "-c"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _measure(database + ["create_table bench name:str age:int"], workdir, 1)
+
+        _report(
+            "python -c pass",
+            _measure([sys.executable, "-c", "pass"], workdir, args.runs),
+        )
+        for command in COMMANDS:
+            _report(command, _measure(database + [command], workdir, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+from collections.abc import Iterable
+
+from .constants import (
+    BLOOM_BITS_PER_VALUE,
+    BLOOM_DIR,
+    BLOOM_HASHES,
+    DB_TABLES_DIR,
+    ID_INITIAL_VALUE,
+    JSON_EXT,
+    SEGMENT_SIZE_KEY,
+    SEGMENTS_KEY,
+)
+
+
+def _create_filter_dirpath(
+    table_name: str, column: str, datapath: str = DB_TABLES_DIR
+) -> str:
+    """Собирает путь к директории, в которой лежат фильтры Блума столбца."""
+    return os.path.join(datapath, table_name, BLOOM_DIR, column)
+
+
+def _create_filter_filepath(table_name: str, column: str, segment: int) -> str:
+    """
+    Собирает полный путь к файлу фильтра Блума сегмента. Также создаёт
+    директорию фильтров столбца, если она не существует.
+    """
+    filter_dirpath = _create_filter_dirpath(table_name, column)
+    os.makedirs(filter_dirpath, exist_ok=True)
+    return os.path.join(filter_dirpath, f"{segment}{JSON_EXT}")
+
+
+def load_filter(table_name: str, column: str, segment: int) -> bytearray | None:
+    """
+    Загружает фильтр Блума одного сегмента.
+
+    Args:
+        table_name (str): Название таблицы
+        column (str): Название столбца
+        segment (int): Номер сегмента
+    Returns:
+        bytearray or None: Биты фильтра или None, если файла фильтра нет.
+    """
+    try:
+        with open(
+            _create_filter_filepath(table_name, column, segment), "r", encoding="utf-8"
+        ) as json_file:
+            return bytearray.fromhex(json.load(json_file))
+    except FileNotFoundError:
+        return None
+
+
+def false_positive_rate(values: float, segment_size: int) -> float:
+    """
+    Оценивает долю ложных срабатываний фильтра сегмента.
+
+    Args:
+        values (float): Количество значений, добавленных в фильтр
+        segment_size (int): Количество ID, которое покрывает один сегмент
+    Returns:
+        float: Вероятность того, что фильтр не исключит отсутствующее значение.
+    """
+    bits = segment_size * BLOOM_BITS_PER_VALUE
+    return (1 - math.exp(-BLOOM_HASHES * values / bits)) ** BLOOM_HASHES
+
+
+class SegmentBloomFilter:
+    """
+    Фильтры Блума по значениям столбца: по одному на каждый сегмент таблицы.
+    Фильтр отвечает, что значения в сегменте точно нет или что оно может там
+    быть, поэтому поиск по равенству читает только сегменты, где значение может
+    быть, а при отсутствии таких не читает таблицу совсем.
+
+    Значения из фильтра не удаляются: после удаления и изменения записей фильтр
+    может пропускать лишние сегменты, пока его не перестроят (vacuum).
+
+    Фильтр каждого сегмента хранится в отдельном файле и загружается при первом
+    обращении, поэтому изменение записи перезаписывает только фильтр её
+    сегмента. Если файла фильтра нет, сегмент считается подходящим для любого
+    значения; такой сегмент получает фильтр, только если новая запись первая в
+    нём (иначе фильтр не знал бы о прежних записях) или после перестроения.
+    Фильтры получают изменения записей от SegmentedTable через apply.
+    """
+
+    def __init__(self, table_name: str, column: str, manifest: dict):
+        """
+        Args:
+            table_name (str): Название таблицы
+            column (str): Название столбца
+            manifest (dict): Манифест сегментов из метаданных таблицы
+        """
+        self.table_name = table_name
+        self.column = column
+        self._segment_size = manifest[SEGMENT_SIZE_KEY]
+        self._counts = manifest[SEGMENTS_KEY]
+        self._size = self._segment_size * BLOOM_BITS_PER_VALUE
+        self._filters = {}
+        self._dirty = set()
+        # После clear файлов фильтров нет, потому что они пусты
+        self._cleared = False
+
+    def _load(self, segment: int) -> bytearray | None:
+        """Возвращает фильтр сегмента, загружая его с диска при первом обращении."""
+        if segment not in self._filters:
+            bits = load_filter(self.table_name, self.column, segment)
+            if bits is None and self._cleared:
+                bits = bytearray(self._size // 8 + 1)
+            self._filters[segment] = bits
+        return self._filters[segment]
+
+    def _positions(self, value: int | str | bool) -> list[int]:
+        """Возвращает номера битов значения (двойное хэширование)."""
+        digest = hashlib.blake2b(repr(value).encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self._size for i in range(BLOOM_HASHES)]
+
+    def add(self, key: int, value: int | str | bool):
+        """
+        Добавляет значение в фильтр сегмента, в который попадает ID. Сегмент без
+        фильтра получает новый фильтр, только если в нём нет других записей.
+        """
+        segment = (key - ID_INITIAL_VALUE) // self._segment_size
+        bits = self._load(segment)
+        if bits is None:
+            if self._counts.get(str(segment), 0) > 1:
+                return
+            bits = self._filters[segment] = bytearray(self._size // 8 + 1)
+
+        for position in self._positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+        self._dirty.add(segment)
+
+    def segments_for(
+        self, value: int | str | bool, segments: Iterable[int]
+    ) -> list[int]:
+        """
+        Отбирает сегменты, в которых может быть значение.
+
+        Args:
+            value (int or str or bool): Искомое значение
+            segments (Iterable[int]): Номера сегментов таблицы
+        Returns:
+            list[int]: Сегменты, которые нужно прочитать.
+        """
+        positions = self._positions(value)
+        return [
+            segment
+            for segment in segments
+            if (bits := self._load(segment)) is None
+            or all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+        ]
+
+    def apply(self, key: int, old_row: dict | None, new_row: dict | None):
+        """
+        Учитывает изменение записи (см. SegmentedTable.subscribe). В фильтр
+        добавляется только новое значение.
+        """
+        if new_row is not None and (
+            old_row is None or old_row[self.column] != new_row[self.column]
+        ):
+            self.add(key, new_row[self.column])
+
+    def clear(self):
+        """Удаляет все значения из фильтров вместе с их файлами."""
+        shutil.rmtree(
+            _create_filter_dirpath(self.table_name, self.column), ignore_errors=True
+        )
+        self._filters = {}
+        self._dirty.clear()
+        self._cleared = True
+
+    def collect_dirty(self) -> dict[int, str]:
+        """
+        Забирает изменённые фильтры для записи на диск, после чего они
+        считаются сохранёнными.
+
+        Returns:
+            dict[int, str]: Фильтры {номер сегмента : биты в шестнадцатеричном
+                виде}.
+        """
+        filters = {segment: self._filters[segment].hex() for segment in self._dirty}
+        self._dirty.clear()
+        return filters
+
+    def write(self, filters: dict[int, str]):
+        """Записывает на диск фильтры, полученные из collect_dirty."""
+        for segment, bits in filters.items():
+            with open(
+                _create_filter_filepath(self.table_name, self.column, segment),
+                "w",
+                encoding="utf-8",
+            ) as json_file:
+                json.dump(bits, json_file)
+
+    def flush(self):
+        """Записывает на диск изменённые фильтры."""
+        self.write(self.collect_dirty())
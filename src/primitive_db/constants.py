@@ -3,6 +3,62 @@ DB_META_FILE = "db_meta.json"
 DB_TABLES_DIR = "data"
 JSON_EXT = ".json"
 
+# Данные таблицы хранятся сегментами по диапазону ID (по SEGMENT_SIZE записей)
+SEGMENT_SIZE = 1000
+# Наибольшее количество сегментов одной таблицы, которые держатся в памяти (пул
+# буферов); давно не использованные сегменты вытесняются
+BUFFER_POOL_SIZE = 16
+
+# Разделы метаданных таблицы
+TABLE_COLUMNS = "columns"
+TABLE_STORAGE = "storage"
+TABLE_DICTIONARIES = "dictionaries"
+TABLE_STATISTICS = "statistics"
+TABLE_UNIQUE = "unique"
+TABLE_BLOOM = "bloom"
+TABLE_VIEWS = "views"
+TABLE_INDEXES = "indexes"
+
+# Уникальные столбцы индексируются хэш-индексом: значения разложены по файлам
+# корзин в директории data/<таблица>/index/<столбец>/. Индекс начинается с
+# INDEX_BUCKETS корзин и добавляет по одной (линейное хэширование), когда
+# значений становится больше INDEX_BUCKET_SIZE на корзину в среднем. Количество
+# корзин и значений хранится в метаданных таблицы:
+# {столбец : {"buckets": ..., "entries": ...}}
+INDEX_DIR = "index"
+INDEX_BUCKETS = 64
+INDEX_BUCKET_SIZE = 256
+# Наибольшее количество корзин одного индекса в памяти (без несохранённых
+# изменений): давно не использованные вытесняются
+INDEX_POOL_SIZE = 256
+
+# Фильтры Блума хранятся по одному файлу на сегмент:
+# data/<таблица>/bloom/<столбец>/<номер сегмента>.json.
+# BLOOM_BITS_PER_VALUE битов на запись и BLOOM_HASHES хэшей дают около 1% ложных
+# срабатываний для заполненного сегмента
+BLOOM_DIR = "bloom"
+BLOOM_BITS_PER_VALUE = 10
+BLOOM_HASHES = 7
+
+# Материализованные представления: запрос хранится в метаданных таблицы
+# {представление : {"where": ..., "aggregates": ..., "group_by": ...}}, а результат -
+# частями в директории data/<таблица>/views/<представление>/: записи по одному
+# файлу на сегмент таблицы (<номер сегмента>.json), состояние групп агрегатов -
+# в файле VIEW_GROUPS_PART.json
+VIEW_DIR = "views"
+VIEW_GROUPS_PART = "groups"
+VIEW_WHERE = "where"
+VIEW_AGGREGATES = "aggregates"
+VIEW_GROUP_BY = "group_by"
+
+# Количество наименьших хэшей значений, по которым оценивается число различных
+# значений в столбце
+DISTINCT_SKETCH_SIZE = 64
+
+# Поля манифеста сегментов таблицы
+SEGMENT_SIZE_KEY = "segment_size"
+SEGMENTS_KEY = "segments"
+
 # Доступные типы данных
 SUPPORTED_DATA_TYPES = {"int": int, "str": str, "bool": bool}
 
@@ -12,6 +68,38 @@ ID_COLUMN_DATA_TYPE_STR = "int"
 ID_COLUMN_DATA_TYPE = SUPPORTED_DATA_TYPES[ID_COLUMN_DATA_TYPE_STR]
 ID_INITIAL_VALUE = 1
 
+# Параметры столбцов, которые указываются после типа ("столбец:тип:параметр")
+COLUMN_OPTION_DICT = "dict"
+COLUMN_OPTION_UNIQUE = "unique"
+COLUMN_OPTION_BLOOM = "bloom"
+COLUMN_OPTIONS = (COLUMN_OPTION_DICT, COLUMN_OPTION_UNIQUE, COLUMN_OPTION_BLOOM)
+# Словарное кодирование доступно только для строковых столбцов
+DICT_DATA_TYPE_STR = "str"
+# Кодирование включается при импорте автоматически, если в первой пачке не меньше
+# DICT_AUTO_MIN_ROWS записей, а доля различных значений не больше DICT_AUTO_MAX_RATIO
+DICT_AUTO_MIN_ROWS = 100
+DICT_AUTO_MAX_RATIO = 0.05
+# Значения словаря хранятся в файле data/<таблица>/dict/<столбец>.jsonl. Если в
+# словаре больше DICT_MAX_VALUES значений, при добавлении новых выводится
+# предупреждение: для столбца с таким количеством различных значений
+# кодирование не даёт выигрыша
+DICT_DIR = "dict"
+DICT_MAX_VALUES = 10000
+
+# Отложенная запись (write-behind): изменения записываются на диск фоновым потоком
+# не реже раза в WRITE_BEHIND_INTERVAL секунд или после WRITE_BEHIND_MAX_PENDING
+# изменённых записей
+WRITE_BEHIND_INTERVAL = 1.0
+WRITE_BEHIND_MAX_PENDING = 1000
+
+# Поля записи журнала команд (database --record): время начала команды (секунды
+# Unix), текст команды и время её выполнения в секундах
+RECORD_TIME = "time"
+RECORD_COMMAND = "command"
+RECORD_LATENCY = "latency"
+# Перцентили времени выполнения в отчёте database-replay
+REPLAY_PERCENTILES = (50, 90, 99)
+
 
 # Доступные команды
 class Command:
@@ -20,16 +108,35 @@ class Command:
     SELECT = "select"
     UPDATE = "update"
     DELETE = "delete"
+    EXPORT = "export"
+    IMPORT = "import"
     # Команды для управления таблицами
     CREATE_TABLE = "create_table"
     LIST_TABLES = "list_tables"
     DROP_TABLE = "drop_table"
     INFO = "info"
+    VACUUM = "vacuum"
+    CREATE_VIEW = "create_view"
+    DROP_VIEW = "drop_view"
     # Общие команды
+    SET = "set"
+    FLUSH = "flush"
     EXIT = "exit"
     HELP = "help"
 
 
+# Команды, которые пишут на диск напрямую: в режиме отложенной записи они
+# выполняются после записи всех отложенных изменений
+EXCLUSIVE_COMMANDS = (
+    Command.IMPORT,
+    Command.CREATE_TABLE,
+    Command.DROP_TABLE,
+    Command.VACUUM,
+    Command.CREATE_VIEW,
+    Command.DROP_VIEW,
+)
+
+
 # Ключевые слова, которые используются в командах
 class Keyword:
     INTO = "into"
@@ -37,6 +144,38 @@ class Keyword:
     FROM = "from"
     WHERE = "where"
     SET = "set"
+    TO = "to"
+    GROUP = "group"
+    BY = "by"
+    JOIN = "join"
+    ON = "on"
+    AS = "as"
+
+
+# Агрегатные функции для select
+class Aggregate:
+    COUNT = "count"
+    SUM = "sum"
+    MIN = "min"
+    MAX = "max"
+    AVG = "avg"
+
+
+AGGREGATE_FUNCTIONS = (
+    Aggregate.COUNT,
+    Aggregate.SUM,
+    Aggregate.MIN,
+    Aggregate.MAX,
+    Aggregate.AVG,
+)
+# Агрегатные функции, которые представления обновляют по изменениям записей
+# (min и max нельзя пересчитать при удалении записи без чтения таблицы)
+INCREMENTAL_AGGREGATES = (Aggregate.COUNT, Aggregate.SUM, Aggregate.AVG)
+# Аргумент count(*) - все записи
+ALL_COLUMNS = "*"
+# Агрегатные функции, которые применимы только к числовым столбцам
+NUMERIC_AGGREGATES = (Aggregate.SUM, Aggregate.AVG)
+NUMERIC_DATA_TYPE_STR = "int"
 
 
 # Литералы истина/ложь
@@ -45,10 +184,47 @@ class Bool:
     FALSE = "false"
 
 
+# Настройки сеанса, которые меняются командой set
+class Setting:
+    FORMAT = "format"
+    SUMMARY = "summary"
+
+
+# Значения для включения и выключения настроек
+class Toggle:
+    ON = "on"
+    OFF = "off"
+
+
+# Форматы вывода результатов select
+class OutputFormat:
+    TABLE = "table"
+    TSV = "tsv"
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+OUTPUT_FORMATS = (
+    OutputFormat.TABLE,
+    OutputFormat.TSV,
+    OutputFormat.JSONL,
+    OutputFormat.CSV,
+)
+
+# Форматы файлов для экспорта и импорта
+JSONL_EXT = ".jsonl"
+CSV_EXT = ".csv"
+# Формат записи для каждого расширения файла при экспорте
+TRANSFER_FORMATS = {JSONL_EXT: OutputFormat.JSONL, CSV_EXT: OutputFormat.CSV}
+# Количество записей, которые проверяются и записываются за раз при импорте
+IMPORT_BATCH_SIZE = 1000
+
 DROP_TABLE_ACTION = "удаление таблицы"
 DELETE_ACTION = "удаление записей"
 
 PLUS_MINUS = "+-"
+# Разделитель названия таблицы и столбца ("таблица.столбец")
+COLUMN_SEPARATOR = "."
 
 DATA_COMMANDS_REFERENCE = (
     (
@@ -62,6 +238,18 @@ DATA_COMMANDS_REFERENCE = (
         "прочитать записи по условию",
     ),
     (f"{Command.SELECT} {Keyword.FROM} <имя_таблицы>", "прочитать все записи"),
+    (
+        f"{Command.SELECT} {Keyword.FROM} <таблица1> {Keyword.JOIN} <таблица2> "
+        f"{Keyword.ON} <таблица1>.<столбец> = <таблица2>.<столбец> "
+        f"[{Keyword.WHERE} <таблица>.<столбец> = <значение>]",
+        "прочитать связанные записи двух таблиц",
+    ),
+    (
+        f"{Command.SELECT} <функция>(<столбец>), ... {Keyword.FROM} <имя_таблицы> "
+        f"[{Keyword.WHERE} <столбец> = <значение>] "
+        f"[{Keyword.GROUP} {Keyword.BY} <столбец>]",
+        f"посчитать {', '.join(AGGREGATE_FUNCTIONS)} по записям",
+    ),
     (
         f"{Command.UPDATE} <имя_таблицы> {Keyword.SET} <столбец> = <новое_значение> "
         f"{Keyword.WHERE} <столбец_условия> = <значение_условия>",
@@ -72,6 +260,15 @@ DATA_COMMANDS_REFERENCE = (
         "<столбец> = <значение>",
         "удалить запись",
     ),
+    (
+        f'{Command.EXPORT} <имя_таблицы> {Keyword.TO} "<файл.jsonl|csv>" '
+        f"[{Keyword.WHERE} <столбец> = <значение>]",
+        "выгрузить записи в файл",
+    ),
+    (
+        f'{Command.IMPORT} <имя_таблицы> {Keyword.FROM} "<файл.jsonl|csv>"',
+        "загрузить записи из файла",
+    ),
 )
 
 TABLE_COMMANDS_REFERENCE = (
@@ -82,9 +279,27 @@ TABLE_COMMANDS_REFERENCE = (
     (f"{Command.DROP_TABLE} <имя_таблицы>", "удалить таблицу"),
     (Command.LIST_TABLES, "показать список всех таблиц"),
     (f"{Command.INFO} <имя_таблицы>", "вывести информацию о таблице"),
+    (
+        f"{Command.VACUUM} [имя_таблицы]",
+        "перезаписать данные таблицы (или всех таблиц) и удалить лишние файлы",
+    ),
+    (
+        f"{Command.CREATE_VIEW} <имя_представления> {Keyword.AS} {Command.SELECT} ...",
+        "создать материализованное представление",
+    ),
+    (f"{Command.DROP_VIEW} <имя_представления>", "удалить представление"),
 )
 
 OTHER_COMMANDS_REFERENCE = (
+    (
+        f"{Command.SET} {Setting.FORMAT} <{'|'.join(OUTPUT_FORMATS)}>",
+        "формат вывода select",
+    ),
+    (
+        f"{Command.SET} {Setting.SUMMARY} <{Toggle.ON}|{Toggle.OFF}>",
+        "выводить для update и delete только количество записей",
+    ),
+    (Command.FLUSH, "записать на диск все отложенные изменения"),
     (Command.EXIT, "выход из программы"),
     (Command.HELP, "справочная информация"),
 )
@@ -1,20 +1,49 @@
-from collections.abc import Callable, Iterable
-
-from prettytable import PrettyTable
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
 
+from .bloom import false_positive_rate
 from .constants import (
+    ALL_COLUMNS,
+    COLUMN_OPTION_BLOOM,
+    COLUMN_OPTION_DICT,
+    COLUMN_OPTION_UNIQUE,
+    COLUMN_OPTIONS,
     DELETE_ACTION,
+    DICT_DATA_TYPE_STR,
+    DICT_MAX_VALUES,
     DROP_TABLE_ACTION,
     ID_COLUMN_DATA_TYPE,
     ID_COLUMN_DATA_TYPE_STR,
     ID_COLUMN_NAME,
     ID_INITIAL_VALUE,
+    NUMERIC_AGGREGATES,
+    NUMERIC_DATA_TYPE_STR,
+    SEGMENT_SIZE_KEY,
     SUPPORTED_DATA_TYPES,
+    TABLE_BLOOM,
+    TABLE_COLUMNS,
+    TABLE_DICTIONARIES,
+    TABLE_INDEXES,
+    TABLE_STATISTICS,
+    TABLE_STORAGE,
+    TABLE_UNIQUE,
+    TABLE_VIEWS,
+    Aggregate,
+    OutputFormat,
 )
 from .decorators import confirm_action, handle_db_errors, log_time
+from .index import excess_buckets
+from .output import ROW_WRITERS, with_keys
+from .schema import get_schema
+from .stats import TableStatistics
+from .storage import SegmentedTable, create_manifest, table_disk_size
+
+if TYPE_CHECKING:
+    from prettytable import PrettyTable
 
 
-def _check_clause(
+def check_clause(
     metadata: dict, table_name: str, clause: dict, show_column_index: bool = False
 ) -> bool:
     """
@@ -27,40 +56,71 @@ def _check_clause(
         clause (dict): Словарь
         show_column_index (bool, optional): Указывать номер столбца в тексте ошибки
     """
-    table_metadata = metadata[table_name]
+    return get_schema(metadata, table_name).check(clause, show_column_index)
 
-    for i, (column, value) in enumerate(clause.items(), start=1):
-        if column not in table_metadata:
-            print(f'Ошибка: Недопустимое имя столбца "{column}".')
-            return False
 
-        type_name = table_metadata[column]
-        data_type = SUPPORTED_DATA_TYPES[type_name]
-        if not isinstance(value, data_type):
-            column_index = f"#{i} " if show_column_index else ""
-            print(
-                f'Ошибка: Неверный тип данных для столбца {column_index}"{column}". '
-                f"Ожидается {type_name}."
+def _candidate_segments(
+    table_data: SegmentedTable, where_clause: dict
+) -> set[int] | None:
+    """
+    Отбирает по фильтрам Блума сегменты, в которых могут быть записи,
+    удовлетворяющие условию.
+
+    Args:
+        table_data (SegmentedTable): Текущие данные таблицы
+        where_clause (dict): Условия для фильтрации
+    Returns:
+        set[int] or None: Номера сегментов или None, если в условии нет столбцов
+            с фильтрами Блума (нужно читать все сегменты).
+    """
+    segments = None
+
+    for column, value in where_clause.items():
+        if column in table_data.filters:
+            candidates = table_data.filters[column].segments_for(
+                value, segments if segments is not None else table_data.segments()
             )
-            return False
+            segments = set(candidates)
 
-    return True
+    return segments
 
 
-def _filter_ids(table_data: dict, where_clause: dict) -> list:
+def filter_rows(
+    table_data: SegmentedTable, where_clause: dict, stream: bool = False
+) -> Iterator[tuple[int, dict]]:
     """
-    Возвращает список первичных ключей, которые удовлетворяют указанному условию.
+    Перебирает пары (первичный ключ, запись), которые удовлетворяют указанному
+    условию. Если в условии есть первичный ключ или уникальный столбец, читается
+    только один сегмент таблицы, а для столбцов с фильтрами Блума - только
+    сегменты, в которых может быть значение. Значения столбцов со словарным кодированием
+    сравниваются по кодам, декодируются только подходящие записи.
 
     Args:
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
         where_clause (dict): Условия для фильтрации
+        stream (bool, optional): Не удерживать прочитанные сегменты в памяти
     Returns:
-        list: Список первичных ключей.
+        Iterator[tuple[int, dict]]: Подходящие записи с их первичными ключами.
     """
-    filtered_keys = []
+    encoded_clause = table_data.encode_clause(where_clause)
+    if encoded_clause is None:
+        return
+
+    indexed = [column for column in where_clause if column in table_data.indexes]
 
-    for key, data in table_data.items():
-        for filter_column, filter_value in where_clause.items():
+    if ID_COLUMN_NAME in where_clause:
+        key = where_clause[ID_COLUMN_NAME]
+        rows = [(key, table_data.get_raw(key))] if key in table_data else []
+    elif indexed:
+        key = table_data.indexes[indexed[0]].get(where_clause[indexed[0]])
+        rows = [(key, table_data.get_raw(key))] if key is not None else []
+    else:
+        rows = table_data.scan(
+            retain=not stream, segments=_candidate_segments(table_data, where_clause)
+        )
+
+    for key, data in rows:
+        for filter_column, filter_value in encoded_clause.items():
             if filter_column == ID_COLUMN_NAME:
                 # ID хранятся в строковом виде - приводим к корректному типу
                 current_value = ID_COLUMN_DATA_TYPE(key)
@@ -70,9 +130,92 @@ def _filter_ids(table_data: dict, where_clause: dict) -> list:
             if current_value != filter_value:
                 break
         else:
-            filtered_keys.append(key)
+            yield key, table_data.decode(data)
+
+
+def _filter_ids(table_data: SegmentedTable, where_clause: dict) -> list:
+    """
+    Возвращает список первичных ключей, которые удовлетворяют указанному условию.
+
+    Args:
+        table_data (SegmentedTable): Текущие данные таблицы
+        where_clause (dict): Условия для фильтрации
+    Returns:
+        list: Список первичных ключей.
+    """
+    return [key for key, _ in filter_rows(table_data, where_clause)]
 
-    return filtered_keys
+
+def check_unique(table_data: SegmentedTable, entry: dict, key: int = None) -> bool:
+    """
+    Проверяет по индексам, что значения уникальных столбцов записи не заняты
+    другими записями. Выводит сообщение при ошибке.
+
+    Args:
+        table_data (SegmentedTable): Текущие данные таблицы
+        entry (dict): Значения столбцов {столбец : значение}
+        key (int, optional): Первичный ключ изменяемой записи (None для новой)
+    """
+    for column, index in table_data.indexes.items():
+        if column not in entry:
+            continue
+
+        owner = index.get(entry[column])
+        if owner is not None and owner != key:
+            print(
+                f'Ошибка: Значение "{entry[column]}" уже есть в уникальном '
+                f'столбце "{column}".'
+            )
+            return False
+
+    return True
+
+
+def warn_overflowed_dictionaries(table_data: SegmentedTable):
+    """
+    Выводит предупреждение для столбцов, в словари которых добавлялись значения
+    сверх DICT_MAX_VALUES.
+
+    Args:
+        table_data (SegmentedTable): Текущие данные таблицы
+    """
+    for column in table_data.overflowed_dictionaries():
+        print(
+            f'Предупреждение: В словаре столбца "{column}" больше '
+            f"{DICT_MAX_VALUES} значений - словарное кодирование не подходит для "
+            "столбца с таким количеством различных значений."
+        )
+
+
+def _describe_columns(table_metadata: dict) -> str:
+    """
+    Собирает описание столбцов таблицы в виде "столбец:тип, ...". Для столбцов со
+    словарным кодированием добавляется параметр ":dict", для уникальных -
+    ":unique", для столбцов с фильтрами Блума - ":bloom".
+
+    Args:
+        table_metadata (dict): Метаданные таблицы
+    Returns:
+        str: Описание столбцов через запятую.
+    """
+    dictionaries = table_metadata.get(TABLE_DICTIONARIES, [])
+    unique = table_metadata.get(TABLE_UNIQUE, [])
+    bloom = table_metadata.get(TABLE_BLOOM, [])
+    columns = []
+
+    for column, data_type in table_metadata[TABLE_COLUMNS].items():
+        options = [
+            option
+            for option, enabled in (
+                (COLUMN_OPTION_DICT, column in dictionaries),
+                (COLUMN_OPTION_UNIQUE, column in unique),
+                (COLUMN_OPTION_BLOOM, column in bloom),
+            )
+            if enabled
+        ]
+        columns.append(":".join([f"{column}:{data_type}", *options]))
+
+    return ", ".join(columns)
 
 
 @handle_db_errors
@@ -84,14 +227,22 @@ def create_table(
     таблицы с таким именем не существует. Столбец "ID:int" будет добавлен
     автоматически.
 
+    Для строковых столбцов можно включить словарное кодирование, указав параметр
+    после типа: "название:str:dict". Параметр "unique" запрещает повторяющиеся
+    значения в столбце: "название:тип:unique" (проверка идёт по хэш-индексу).
+    Параметр "bloom" включает фильтры Блума по сегментам для быстрого поиска
+    отсутствующих значений: "название:тип:bloom".
+
     Выводит ошибку, если:
     - таблица уже существует
     - указан некорректный тип данных (поддерживаются: int | str | bool)
+    - указан неизвестный параметр столбца
 
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название новой таблицы
         columns (Iterable[str]): Список столбцов в виде "название:тип_данных"
+            или "название:тип_данных:параметр"
 
     Returns:
         dict (optional): Обновлённый словарь метаданных или None, если таблица
@@ -106,27 +257,53 @@ def create_table(
         print(f'Ошибка: Таблица "{table_name}" уже существует.')
         return None
 
+    if any(table_name in table.get(TABLE_VIEWS, {}) for table in metadata.values()):
+        print(f'Ошибка: Представление "{table_name}" уже существует.')
+        return None
+
     table_metadata = {ID_COLUMN_NAME: ID_COLUMN_DATA_TYPE_STR}
+    dictionaries = []
+    unique = []
+    bloom = []
 
     for column in columns:
-        name, _, data_type = map(str.strip, column.partition(":"))
+        name, _, spec = map(str.strip, column.partition(":"))
+        data_type, *options = map(str.strip, spec.split(":"))
 
         if not name or data_type not in SUPPORTED_DATA_TYPES:
             print(f'Некорректное значение: "{column}". Попробуйте снова.')
             return None
 
+        if any(option not in COLUMN_OPTIONS for option in options) or (
+            COLUMN_OPTION_DICT in options and data_type != DICT_DATA_TYPE_STR
+        ):
+            print(f'Некорректное значение: "{column}". Попробуйте снова.')
+            return None
+
         # Столбец ID всегда добавляется автоматически, даже если указан явно
         if name == ID_COLUMN_NAME:
             continue
 
         table_metadata[name] = data_type
+        if COLUMN_OPTION_DICT in options:
+            dictionaries.append(name)
+        if COLUMN_OPTION_UNIQUE in options:
+            unique.append(name)
+        if COLUMN_OPTION_BLOOM in options:
+            bloom.append(name)
+
+    metadata[table_name] = {
+        TABLE_COLUMNS: table_metadata,
+        TABLE_STORAGE: create_manifest(),
+        TABLE_DICTIONARIES: dictionaries,
+        TABLE_STATISTICS: {},
+        TABLE_UNIQUE: unique,
+        TABLE_BLOOM: bloom,
+    }
 
-    metadata[table_name] = table_metadata
-
-    created_columns = [":".join(item) for item in table_metadata.items()]
     print(
         f'Таблица "{table_name}" успешно создана '
-        f"со столбцами: {', '.join(created_columns)}"
+        f"со столбцами: {_describe_columns(metadata[table_name])}"
     )
 
     return metadata
@@ -172,9 +349,9 @@ def list_tables(metadata: dict):
 def insert(
     metadata: dict,
     table_name: str,
-    table_data: dict,
+    table_data: SegmentedTable,
     values: Iterable[int | str | bool],
-) -> dict | None:
+) -> SegmentedTable | None:
     """
     Добавляет новую запись в таблицу, если она существует. Перед добавлением
     производится проверка значений на соответствие схеме таблицы. Значение для
@@ -183,33 +360,23 @@ def insert(
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
         values (Iterable[int or str or bool]): Новые значения для добавления
     Returns:
-        dict (optional): Обновлённые данные таблицы или None, если вставка новых
-        данных не была произведена.
+        SegmentedTable (optional): Обновлённые данные таблицы или None, если
+        вставка новых данных не была произведена.
     """
 
-    table_metadata = metadata[table_name]
-    columns = [column for column in table_metadata if column != ID_COLUMN_NAME]
-    values = list(values)
-
-    if len(values) != len(columns):
-        print("Ошибка: Передано неверное количество значений.")
+    new_entry = get_schema(metadata, table_name).make_entry(values)
+    if new_entry is None or not check_unique(table_data, new_entry):
         return None
 
-    new_entry = dict(zip(columns, values))
-    if not _check_clause(metadata, table_name, new_entry, show_column_index=True):
-        return None
-
-    new_id = (
-        max(ID_COLUMN_DATA_TYPE(key) for key in table_data.keys()) + 1
-        if table_data
-        else ID_INITIAL_VALUE
-    )
+    last_id = table_data.last_key()
+    new_id = last_id + 1 if last_id is not None else ID_INITIAL_VALUE
     table_data[new_id] = new_entry
 
     print(f'Запись с ID={new_id} успешно добавлена в таблицу "{table_name}".')
+    warn_overflowed_dictionaries(table_data)
 
     return table_data
 
@@ -219,33 +386,48 @@ def insert(
 def select(
     metadata: dict,
     table_name: str,
-    table_data: dict,
+    table_data: SegmentedTable,
     where_clause: dict = None,
     cacher: Callable = None,
+    output_format: str = OutputFormat.TABLE,
 ):
     """
     Выводит все записи из данных таблицы. Если указано условие where_clause, то
     записи фильтруются и выводятся только подходящие.
 
+    В формате table записи выводятся таблицей PrettyTable (результат кэшируется).
+    Остальные форматы (tsv, jsonl, csv) выводят записи потоком, по одной, без
+    кэширования и без загрузки всего результата в память.
+
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
         where_clause (dict or None): Условия для фильтрации (если применимы)
         cacher (Callable or None): Функция, которая извлекает данные из кэша по ключу
+        output_format (str, optional): Формат вывода (table | tsv | jsonl | csv)
     """
 
-    def _get_from_db() -> PrettyTable:
+    def _get_from_db() -> "PrettyTable":
+        # prettytable нужен только для вывода select - импортируем при первом вызове
+        from prettytable import PrettyTable
+
         table = PrettyTable()
-        table.field_names = list(metadata[table_name].keys())
+        table.field_names = list(metadata[table_name][TABLE_COLUMNS].keys())
 
-        for key in _filter_ids(table_data, where_clause):
-            table.add_row([key, *table_data[key].values()])
+        for key, data in filter_rows(table_data, where_clause):
+            table.add_row([key, *data.values()])
 
         return table
 
     where_clause = where_clause or {}
-    if not _check_clause(metadata, table_name, where_clause):
+    if not check_clause(metadata, table_name, where_clause):
+        return
+
+    if output_format in ROW_WRITERS:
+        columns = list(metadata[table_name][TABLE_COLUMNS])
+        records = with_keys(filter_rows(table_data, where_clause, stream=True))
+        ROW_WRITERS[output_format](sys.stdout, columns, records)
         return
 
     if cacher:
@@ -257,14 +439,226 @@ def select(
     print(table)
 
 
+def _get_statistics(metadata: dict, table_name: str) -> TableStatistics:
+    """Возвращает статистику по столбцам таблицы из метаданных."""
+    table_metadata = metadata[table_name]
+    return TableStatistics(
+        table_metadata.setdefault(TABLE_STATISTICS, {}), table_metadata[TABLE_COLUMNS]
+    )
+
+
+def check_aggregates(
+    metadata: dict, table_name: str, aggregates: list[tuple], group_by: str | None
+) -> bool:
+    """
+    Проверяет, что агрегатные функции и столбец группировки соответствуют схеме
+    таблицы. Выводит сообщение при ошибке.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        aggregates (list[tuple]): Пары (функция, столбец)
+        group_by (str or None): Столбец группировки
+    """
+    table_metadata = metadata[table_name][TABLE_COLUMNS]
+
+    columns = [column for _, column in aggregates if column != ALL_COLUMNS]
+    if group_by is not None:
+        columns.append(group_by)
+
+    for column in columns:
+        if column not in table_metadata:
+            print(f'Ошибка: Недопустимое имя столбца "{column}".')
+            return False
+
+    for func, column in aggregates:
+        if (
+            func in NUMERIC_AGGREGATES
+            and table_metadata[column] != NUMERIC_DATA_TYPE_STR
+        ):
+            print(
+                f"Ошибка: Функция {func} применима только к столбцам типа "
+                f"{NUMERIC_DATA_TYPE_STR}."
+            )
+            return False
+
+    return True
+
+
+def initial_aggregate_state(aggregates: list[tuple]) -> list:
+    """Возвращает начальные значения для накопления агрегатов."""
+    initial = {
+        Aggregate.COUNT: lambda: 0,
+        Aggregate.SUM: lambda: 0,
+        Aggregate.MIN: lambda: None,
+        Aggregate.MAX: lambda: None,
+        Aggregate.AVG: lambda: [0, 0],  # сумма и количество
+    }
+    return [initial[func]() for func, _ in aggregates]
+
+
+def _accumulate(state: list, aggregates: list[tuple], key: int, data: dict):
+    """Учитывает одну запись в накопленных значениях агрегатов."""
+    for i, (func, column) in enumerate(aggregates):
+        if func == Aggregate.COUNT:
+            state[i] += 1
+            continue
+
+        value = key if column == ID_COLUMN_NAME else data[column]
+        match func:
+            case Aggregate.SUM:
+                state[i] += value
+            case Aggregate.MIN if state[i] is None or value < state[i]:
+                state[i] = value
+            case Aggregate.MAX if state[i] is None or value > state[i]:
+                state[i] = value
+            case Aggregate.AVG:
+                state[i][0] += value
+                state[i][1] += 1
+
+
+def finalize_aggregates(state: list, aggregates: list[tuple]) -> list:
+    """Превращает накопленные значения в результаты агрегатов."""
+    return [
+        (value[0] / value[1] if value[1] else None) if func == Aggregate.AVG else value
+        for (func, _), value in zip(aggregates, state)
+    ]
+
+
+def _aggregate_from_metadata(
+    metadata: dict,
+    table_name: str,
+    table_data: SegmentedTable,
+    aggregates: list[tuple],
+) -> list | None:
+    """
+    Вычисляет агрегаты по всей таблице без чтения данных: count берётся из
+    манифеста сегментов, min и max - из статистики, если её границы точны.
+
+    Returns:
+        list or None: Значения агрегатов или None, если хотя бы один агрегат
+            нельзя вычислить по метаданным.
+    """
+    statistics = _get_statistics(metadata, table_name)
+    results = []
+
+    for func, column in aggregates:
+        match func:
+            case Aggregate.COUNT:
+                results.append(len(table_data))
+            case Aggregate.MIN if statistics[column].exact:
+                results.append(statistics[column].min)
+            case Aggregate.MAX if statistics[column].exact:
+                results.append(statistics[column].max)
+            case _:
+                return None
+
+    return results
+
+
+@log_time
+@handle_db_errors
+def select_aggregates(
+    metadata: dict,
+    table_name: str,
+    table_data: SegmentedTable,
+    aggregates: list[tuple],
+    where_clause: dict = None,
+    group_by: str = None,
+    cacher: Callable = None,
+    output_format: str = OutputFormat.TABLE,
+):
+    """
+    Выводит значения агрегатных функций (count, sum, min, max, avg) по записям
+    таблицы. Если указан group_by, значения считаются для каждой группы записей
+    с одинаковым значением столбца.
+
+    Агрегаты считаются за один проход по записям без их накопления в памяти.
+    Для всей таблицы без группировки count(*), а также min и max (при точной
+    статистике) берутся из метаданных без чтения данных таблицы.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        aggregates (list[tuple]): Пары (функция, столбец)
+        where_clause (dict or None): Условия для фильтрации (если применимы)
+        group_by (str or None): Столбец для группировки
+        cacher (Callable or None): Функция, которая извлекает данные из кэша по ключу
+        output_format (str, optional): Формат вывода (table | tsv | jsonl | csv)
+    """
+
+    def _get_from_db() -> list[list]:
+        if not where_clause and group_by is None:
+            results = _aggregate_from_metadata(
+                metadata, table_name, table_data, aggregates
+            )
+            if results is not None:
+                return [results]
+
+        groups = {}
+        for key, data in filter_rows(table_data, where_clause, stream=True):
+            if group_by is None:
+                group = None
+            else:
+                group = key if group_by == ID_COLUMN_NAME else data[group_by]
+
+            if group not in groups:
+                groups[group] = initial_aggregate_state(aggregates)
+            _accumulate(groups[group], aggregates, key, data)
+
+        if group_by is None:
+            state = groups.get(None, initial_aggregate_state(aggregates))
+            return [finalize_aggregates(state, aggregates)]
+
+        return [
+            [group, *finalize_aggregates(state, aggregates)]
+            for group, state in sorted(groups.items())
+        ]
+
+    where_clause = where_clause or {}
+    if not check_clause(metadata, table_name, where_clause):
+        return
+    if not check_aggregates(metadata, table_name, aggregates, group_by):
+        return
+
+    columns = [f"{func}({column})" for func, column in aggregates]
+    if group_by is not None:
+        columns.insert(0, group_by)
+
+    if cacher:
+        key = (
+            table_name,
+            frozenset(where_clause.items()),
+            tuple(aggregates),
+            group_by,
+        )
+        rows = cacher(key, _get_from_db)
+    else:
+        rows = _get_from_db()
+
+    if output_format in ROW_WRITERS:
+        records = (dict(zip(columns, row)) for row in rows)
+        ROW_WRITERS[output_format](sys.stdout, columns, records)
+        return
+
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = columns
+    table.add_rows(rows)
+    print(table)
+
+
 @handle_db_errors
 def update(
     metadata: dict,
     table_name: str,
-    table_data: dict,
+    table_data: SegmentedTable,
     set_clause: dict,
     where_clause: dict,
-) -> dict | None:
+    summary: bool = False,
+) -> SegmentedTable | None:
     """
     Обновляет существующие записи в указанной таблице, выбирая их по условию.
     Если попытаться обновить первичный ключ, выводит ошибку.
@@ -272,12 +666,13 @@ def update(
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
         set_clause (dict): Столбцы, которые нужно обновить, со значениями
         where_clause (dict): Условия для выбора записей для обновления.
+        summary (bool, optional): Вывести только количество обновлённых записей
     Returns:
-        dict (optional): Обновлённые данные таблицы или None, если данные не
-        обновились.
+        SegmentedTable (optional): Обновлённые данные таблицы или None, если
+        данные не обновились.
     """
 
     if ID_COLUMN_NAME in set_clause:
@@ -285,14 +680,31 @@ def update(
         return None
 
     if any(
-        not _check_clause(metadata, table_name, clause)
+        not check_clause(metadata, table_name, clause)
         for clause in (set_clause, where_clause)
     ):
         return None
 
-    for key in _filter_ids(table_data, where_clause):
+    keys = _filter_ids(table_data, where_clause)
+
+    unique = [column for column in set_clause if column in table_data.indexes]
+    if unique and len(keys) > 1:
+        print(
+            f'Ошибка: Нельзя присвоить одно значение уникального столбца "{unique[0]}" '
+            "нескольким записям."
+        )
+        return None
+    if unique and keys and not check_unique(table_data, set_clause, keys[0]):
+        return None
+
+    for key in keys:
         table_data[key] |= set_clause
-        print(f'Запись с ID={key} в таблице "{table_name}" успешно обновлена.')
+        if not summary:
+            print(f'Запись с ID={key} в таблице "{table_name}" успешно обновлена.')
+
+    if summary:
+        print(f'Обновлено записей в таблице "{table_name}": {len(keys)}.')
+    warn_overflowed_dictionaries(table_data)
 
     return table_data
 
@@ -302,49 +714,136 @@ def update(
 def delete(
     metadata: dict,
     table_name: str,
-    table_data: dict,
+    table_data: SegmentedTable,
     where_clause: dict,
-) -> dict | None:
+    summary: bool = False,
+) -> SegmentedTable | None:
     """
     Удаляет записи из указанной таблицы по условию.
 
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
         where_clause (dict): Условия для выбора записей для обновления.
+        summary (bool, optional): Вывести только количество удалённых записей
     Returns:
-        dict (optional): Обновлённые данные таблицы или None, если удаление
-        не было произведено.
+        SegmentedTable (optional): Обновлённые данные таблицы или None, если
+        удаление не было произведено.
     """
 
-    if not _check_clause(metadata, table_name, where_clause):
+    if not check_clause(metadata, table_name, where_clause):
         return None
 
-    for key in _filter_ids(table_data, where_clause):
+    keys = _filter_ids(table_data, where_clause)
+    for key in keys:
         del table_data[key]
-        print(f'Запись с ID={key} успешно удалена из таблицы "{table_name}".')
+        if not summary:
+            print(f'Запись с ID={key} успешно удалена из таблицы "{table_name}".')
+
+    if summary:
+        print(f'Удалено записей из таблицы "{table_name}": {len(keys)}.')
 
     return table_data
 
 
+def _reclaimable(
+    metadata: dict, table_name: str, table_data: SegmentedTable
+) -> list[str]:
+    """
+    Оценивает по метаданным, что исправит vacuum в таблице (данные не
+    читаются):
+    - неточные границы статистики после удаления минимума или максимума
+    - значения словарей, которые могли перестать встречаться в записях (не
+      больше количества удалённых и заменённых значений столбца и размера
+      словаря)
+    - корзины индексов сверх нужного для текущего количества значений
+    - значения удалённых и изменённых записей в фильтрах Блума, которые
+      увеличивают долю ложных срабатываний (лишние чтения сегментов)
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+    Returns:
+        list[str]: Строки отчёта.
+    """
+    table_metadata = metadata[table_name]
+    statistics = _get_statistics(metadata, table_name)
+
+    inexact = sum(
+        not statistics[column].exact for column in table_metadata[TABLE_COLUMNS]
+    )
+    lines = [f"неточные границы статистики (столбцов): {inexact}"]
+
+    if dictionaries := table_metadata.get(TABLE_DICTIONARIES):
+        unused = sum(
+            min(statistics[column].stale, table_data.dictionary_size(column))
+            for column in dictionaries
+        )
+        lines.append(f"неиспользуемые значения словарей: не больше {unused}")
+
+    if unique := table_metadata.get(TABLE_UNIQUE):
+        states = table_metadata.get(TABLE_INDEXES, {})
+        extra = sum(
+            excess_buckets(states[column]) for column in unique if column in states
+        )
+        lines.append(f"лишние корзины индексов: {extra}")
+
+    if bloom := table_metadata.get(TABLE_BLOOM):
+        stale = sum(statistics[column].stale for column in bloom)
+        segment_size = table_metadata[TABLE_STORAGE][SEGMENT_SIZE_KEY]
+        segments = max(len(table_data.segments()), 1)
+        # Среднее количество значений в фильтре одного сегмента
+        values = len(table_data) / segments
+        stale_values = stale / len(bloom) / segments
+        current = false_positive_rate(values + stale_values, segment_size)
+        rebuilt = false_positive_rate(values, segment_size)
+        lines.append(
+            f"устаревшие значения фильтров Блума: {stale} (ложные срабатывания "
+            f"~{current:.2%}, после vacuum ~{rebuilt:.2%})"
+        )
+
+    return lines
+
+
 @handle_db_errors
-def info(metadata: dict, table_name: str, table_data: dict):
+def info(metadata: dict, table_name: str, table_data: SegmentedTable):
     """
     Выводит информацию о таблице: название, схема данных (колонки и типы данных),
-    количество записей.
+    количество записей, размер на диске, что исправит vacuum, представления по
+    таблице и статистику по столбцам.
+    Количество записей берётся из манифеста сегментов, а статистика - из
+    метаданных, данные таблицы не читаются.
 
     Args:
         metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict): Текущие данные таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
     """
 
-    table_metadata = metadata[table_name]
-    columns = ", ".join(
-        f"{column}:{data_type}" for column, data_type in table_metadata.items()
-    )
+    columns = _describe_columns(metadata[table_name])
+    statistics = _get_statistics(metadata, table_name)
 
     print(f"Таблица: {table_name}")
     print(f"Столбцы: {columns}")
     print(f"Количество записей: {len(table_data)}")
+    print(f"Размер на диске: {table_disk_size(table_name)} байт")
+    print("Исправит vacuum:")
+    for line in _reclaimable(metadata, table_name, table_data):
+        print(f"- {line}")
+    if views := metadata[table_name].get(TABLE_VIEWS):
+        print(f"Представления: {', '.join(views)}")
+    print("Статистика по столбцам:")
+
+    for column in metadata[table_name][TABLE_COLUMNS]:
+        column_stats = statistics[column]
+        if column_stats.min is None:
+            print(f"- {column}: нет значений")
+            continue
+
+        note = "" if column_stats.exact else " (границы могут быть неточными)"
+        print(
+            f"- {column}: min {column_stats.min}, max {column_stats.max}, "
+            f"различных значений ~{column_stats.distinct}{note}"
+        )
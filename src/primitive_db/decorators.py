@@ -1,7 +1,10 @@
+import sys
+import threading
 import time
 from functools import wraps
 
-import prompt
+# Суммарное время ожидания ответа на подтверждения в каждом потоке
+_confirmations = threading.local()
 
 
 def handle_db_errors(func):
@@ -41,7 +44,10 @@ def handle_file_errors(func):
 
 def confirm_action(action_name: str):
     """
-    Декоратор для подтверждения действия пользователем.
+    Декоратор для подтверждения действия пользователем. Если установлен
+    атрибут confirm_action.assume_yes (воспроизведение журнала команд), действие
+    выполняется без вопроса. Время ожидания ответа учитывается в
+    confirmation_time.
 
     Args:
         action_name (str): Название действия, которое отобразится при подтверждении.
@@ -50,10 +56,19 @@ def confirm_action(action_name: str):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if confirm_action.assume_yes:
+                return func(*args, **kwargs)
+
+            import prompt
+
+            start_time = time.perf_counter()
             response = prompt.character(
                 f'Вы уверены, что хотите выполнить "{action_name}"? [y/N]: ',
                 empty=True,
             )
+            _confirmations.elapsed = (
+                confirmation_time() + time.perf_counter() - start_time
+            )
 
             if response == "y":
                 return func(*args, **kwargs)
@@ -63,9 +78,21 @@ def confirm_action(action_name: str):
     return decorator
 
 
+confirm_action.assume_yes = False
+
+
+def confirmation_time() -> float:
+    """
+    Возвращает суммарное время (в секундах), которое текущий поток ждал ответа
+    пользователя на подтверждения confirm_action.
+    """
+    return getattr(_confirmations, "elapsed", 0.0)
+
+
 def log_time(func):
     """
-    Декоратор для измерения и вывода времени выполнения операции.
+    Декоратор для измерения и вывода времени выполнения операции. Время
+    выводится в stderr, чтобы не смешиваться с результатами команд.
     """
 
     @wraps(func)
@@ -76,7 +103,10 @@ def log_time(func):
         result = func(*args, **kwargs)
         elapsed = time.monotonic() - start_time
 
-        print(f"Функция {func_name} выполнилась за {elapsed:.5f} секунд.")
+        print(
+            f"Функция {func_name} выполнилась за {elapsed:.5f} секунд.",
+            file=sys.stderr,
+        )
 
         return result
 
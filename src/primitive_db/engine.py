@@ -1,12 +1,18 @@
+import threading
 from collections.abc import Callable
-
-import prompt
+from contextlib import AbstractContextManager, nullcontext
 
 from .constants import (
     DATA_COMMANDS_REFERENCE,
+    EXCLUSIVE_COMMANDS,
     OTHER_COMMANDS_REFERENCE,
+    OUTPUT_FORMATS,
     TABLE_COMMANDS_REFERENCE,
     Command,
+    Keyword,
+    OutputFormat,
+    Setting,
+    Toggle,
 )
 from .core import (
     create_table,
@@ -16,11 +22,136 @@ from .core import (
     insert,
     list_tables,
     select,
+    select_aggregates,
     update,
 )
 from .decorators import create_cacher
+from .join import select_join
+from .maintenance import vacuum
 from .parser import parse_command
-from .utils import load_metadata, load_table_data, save_metadata, save_table_data
+from .recorder import CommandRecorder
+from .storage import SegmentedTable
+from .transfer import export_table, import_table
+from .utils import (
+    load_metadata,
+    load_table_data,
+    remove_table_data,
+    save_metadata,
+    save_table_data,
+)
+from .views import create_view, drop_view, find_view, select_view
+from .writer import WriteBehind
+
+
+class Session:
+    """
+    Состояние сеанса работы с базой данных: кэш результатов select и настройки
+    вывода, которые меняются командой set. Команды сеанса выполняются по одной,
+    даже если их передают из нескольких потоков (database-replay).
+
+    В режиме отложенной записи (write_behind) метаданные и открытые таблицы
+    хранятся в памяти между командами, а изменения записываются на диск фоновым
+    потоком (см. WriteBehind).
+    """
+
+    def __init__(
+        self,
+        output_format: str = OutputFormat.TABLE,
+        summary: bool = False,
+        write_behind: bool = False,
+        record: str | None = None,
+    ):
+        """
+        Args:
+            output_format (str, optional): Формат вывода select
+            summary (bool, optional): Выводить для update и delete только количество
+                затронутых записей
+            write_behind (bool, optional): Записывать изменения на диск в фоне
+            record (str, optional): Путь к журналу, в который записываются
+                выполненные команды и время их выполнения
+        """
+        self.cacher = create_cacher()
+        self.output_format = output_format
+        self.summary = summary
+        self.writer = WriteBehind() if write_behind else None
+        self.recorder = CommandRecorder(record) if record else None
+        self._lock = threading.RLock()
+
+    def load_metadata(self) -> dict:
+        """Возвращает текущие метаданные."""
+        return self.writer.metadata if self.writer else load_metadata()
+
+    def open_table(self, metadata: dict, table_name: str) -> SegmentedTable:
+        """Возвращает данные таблицы."""
+        if self.writer:
+            return self.writer.open_table(table_name)
+        return load_table_data(metadata, table_name)
+
+    def save_table(self, metadata: dict, table_name: str, table_data: SegmentedTable):
+        """
+        Сохраняет данные таблицы: сразу или, в режиме отложенной записи,
+        отмечает таблицу для фоновой записи.
+        """
+        if self.writer:
+            self.writer.mark_dirty(table_name)
+        else:
+            save_table_data(metadata, table_name, table_data)
+
+    def locked(self, command: str | tuple | None) -> AbstractContextManager:
+        """
+        Возвращает блокировку состояния на время выполнения команды. Команды,
+        которые пишут на диск напрямую, выполняются после записи всех
+        отложенных изменений.
+
+        Команда flush выполняется без блокировки состояния: WriteBehind.flush
+        сам берёт блокировку записи, а затем lock, и ожидание записи под lock
+        приводило бы к взаимной блокировке с фоновым потоком.
+        """
+        if self.writer is None:
+            return self._lock
+        if command == Command.FLUSH:
+            return nullcontext()
+        if isinstance(command, tuple) and command[0] in EXCLUSIVE_COMMANDS:
+            return self.writer.exclusive()
+        return self.writer.lock
+
+    def flush(self):
+        """Дожидается записи на диск всех отложенных изменений."""
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Завершает сеанс, записывая на диск отложенные изменения, и закрывает
+        журнал команд.
+        """
+        if self.writer:
+            self.writer.close()
+        if self.recorder:
+            self.recorder.close()
+
+
+def change_setting(session: Session, setting: str, value: str):
+    """
+    Меняет настройку сеанса. Выводит ошибку, если настройка или её значение
+    неизвестны.
+
+    Args:
+        session (Session): Текущий сеанс
+        setting (str): Название настройки
+        value (str): Новое значение
+    """
+    match setting:
+        case Setting.FORMAT if value in OUTPUT_FORMATS:
+            session.output_format = value
+            print(f"Формат вывода: {value}")
+        case Setting.SUMMARY if value in (Toggle.ON, Toggle.OFF):
+            session.summary = value == Toggle.ON
+            print(f"Краткий вывод для update и delete: {value}")
+        case Setting.FORMAT | Setting.SUMMARY:
+            print(f'Некорректное значение "{value}" для настройки "{setting}".')
+        case _:
+            print(f'Настройки "{setting}" нет. Попробуйте снова.')
 
 
 def _save_metadata_when_modified(
@@ -37,24 +168,28 @@ def _save_metadata_when_modified(
     """
     if new_metadata is not None:
         save_metadata(new_metadata)
-        save_table_data(table_name, {})  # Удаляем все данные таблицы
+        remove_table_data(table_name)  # Удаляем все данные таблицы
         cache_invalidator()
 
 
 def _save_data_when_modified(
-    table_name: str, new_table_data: dict | None, cache_invalidator: Callable
+    session: Session,
+    metadata: dict,
+    table_name: str,
+    new_table_data: SegmentedTable | None,
 ):
     """
     Сохраняет данные таблицы и очищает кэш, если новое значение не None.
 
     Args:
+        session (Session): Текущий сеанс
+        metadata (dict): Текущие метаданные
         table_name (str): Название таблицы
-        table_data (dict, optional): Обновлённые данные таблицы или None
-        cache_invalidator (Callable): Функция очистки кэша
+        table_data (SegmentedTable, optional): Обновлённые данные таблицы или None
     """
     if new_table_data is not None:
-        save_table_data(table_name, new_table_data)
-        cache_invalidator()
+        session.save_table(metadata, table_name, new_table_data)
+        session.cacher.invalidate()
 
 
 def get_command_from_user() -> str:
@@ -65,6 +200,10 @@ def get_command_from_user() -> str:
         str: Пользовательская команда.
     """
 
+    # prompt импортируется только в интерактивном режиме - это ускоряет запуск
+    # для однократных команд (database -c "...")
+    import prompt
+
     try:
         return prompt.string("\nВведите команду: ")
     except (KeyboardInterrupt, EOFError):
@@ -87,42 +226,111 @@ def print_help():
         print(f"<command> {command} - {description}")
 
 
-def run():
+def execute(cmd: str, session: Session) -> bool:
     """
-    Выполняет основной цикл программы: запрашивает команду у пользователя и
-    выполняет её.
+    Выполняет одну команду пользователя. Если сеанс ведёт журнал команд,
+    команда записывается в него вместе со временем выполнения.
+
+    Args:
+        cmd (str): Команда в виде строки
+        session (Session): Текущий сеанс
+    Returns:
+        bool: False, если команда завершает работу программы, иначе True.
     """
 
-    print_help()
+    if session.recorder is None:
+        return _execute(cmd, session)
+
+    with session.recorder.measure(cmd):
+        return _execute(cmd, session)
 
-    cacher = create_cacher()
+
+def _execute(cmd: str, session: Session) -> bool:
+    """Выполняет одну команду пользователя (см. execute)."""
+
+    cacher = session.cacher
     cache_invalidator = cacher.invalidate
+    command = parse_command(cmd)
 
-    while True:
-        cmd = get_command_from_user()
-        metadata = load_metadata()
+    with session.locked(command):
+        metadata = session.load_metadata()
 
-        match parse_command(cmd):
+        match command:
             case (Command.INFO, table_name):
-                table_data = load_table_data(table_name)
+                table_data = session.open_table(metadata, table_name)
                 info(metadata, table_name, table_data)
             case (Command.DELETE, table_name, where_clause):
-                table_data = load_table_data(table_name)
-                new_table_data = delete(metadata, table_name, table_data, where_clause)
-                _save_data_when_modified(table_name, new_table_data, cache_invalidator)
+                table_data = session.open_table(metadata, table_name)
+                new_table_data = delete(
+                    metadata, table_name, table_data, where_clause, session.summary
+                )
+                _save_data_when_modified(session, metadata, table_name, new_table_data)
             case (Command.UPDATE, table_name, set_clause, where_clause):
-                table_data = load_table_data(table_name)
+                table_data = session.open_table(metadata, table_name)
                 new_table_data = update(
-                    metadata, table_name, table_data, set_clause, where_clause
+                    metadata,
+                    table_name,
+                    table_data,
+                    set_clause,
+                    where_clause,
+                    session.summary,
+                )
+                _save_data_when_modified(session, metadata, table_name, new_table_data)
+            case (Command.SELECT, view_name, where_clause) if (
+                view_name not in metadata
+                and (table_name := find_view(metadata, view_name)) is not None
+            ):
+                table_data = session.open_table(metadata, table_name)
+                select_view(
+                    metadata, view_name, table_data, where_clause, session.output_format
                 )
-                _save_data_when_modified(table_name, new_table_data, cache_invalidator)
             case (Command.SELECT, table_name, where_clause):
-                table_data = load_table_data(table_name)
-                select(metadata, table_name, table_data, where_clause, cacher)
+                table_data = session.open_table(metadata, table_name)
+                select(
+                    metadata,
+                    table_name,
+                    table_data,
+                    where_clause,
+                    cacher,
+                    session.output_format,
+                )
+            case (Command.SELECT, table_name, aggregates, where_clause, group_by):
+                table_data = session.open_table(metadata, table_name)
+                select_aggregates(
+                    metadata,
+                    table_name,
+                    table_data,
+                    aggregates,
+                    where_clause,
+                    group_by,
+                    cacher,
+                    session.output_format,
+                )
+            case (Command.SELECT, Keyword.JOIN, left_table, right_table, on, where):
+                select_join(
+                    metadata,
+                    left_table,
+                    right_table,
+                    session.open_table(metadata, left_table),
+                    session.open_table(metadata, right_table),
+                    on,
+                    where,
+                    cacher,
+                    session.output_format,
+                )
             case (Command.INSERT, table_name, values):
-                table_data = load_table_data(table_name)
+                table_data = session.open_table(metadata, table_name)
                 new_table_data = insert(metadata, table_name, table_data, values)
-                _save_data_when_modified(table_name, new_table_data, cache_invalidator)
+                _save_data_when_modified(session, metadata, table_name, new_table_data)
+            case (Command.EXPORT, table_name, filepath, where_clause):
+                table_data = session.open_table(metadata, table_name)
+                export_table(metadata, table_name, table_data, filepath, where_clause)
+            case (Command.IMPORT, table_name, filepath):
+                table_data = session.open_table(metadata, table_name)
+                new_table_data = import_table(
+                    metadata, table_name, table_data, filepath
+                )
+                _save_data_when_modified(session, metadata, table_name, new_table_data)
             case (Command.CREATE_TABLE, table_name, columns):
                 new_metadata = create_table(metadata, table_name, columns)
                 _save_metadata_when_modified(
@@ -133,13 +341,80 @@ def run():
                 _save_metadata_when_modified(
                     table_name, new_metadata, cache_invalidator
                 )
+            case (Command.VACUUM, table_name):
+                if vacuum(metadata, table_name) is not None:
+                    save_metadata(metadata)
+                    cache_invalidator()
+            case (
+                Command.CREATE_VIEW,
+                view_name,
+                table_name,
+                aggregates,
+                where_clause,
+                group_by,
+            ):
+                table_data = session.open_table(metadata, table_name)
+                new_metadata = create_view(
+                    metadata,
+                    view_name,
+                    table_name,
+                    table_data,
+                    aggregates,
+                    where_clause,
+                    group_by,
+                )
+                if new_metadata is not None:
+                    save_table_data(new_metadata, table_name, table_data)
+            case (Command.DROP_VIEW, view_name):
+                if (new_metadata := drop_view(metadata, view_name)) is not None:
+                    save_metadata(new_metadata)
+            case (Command.SET, setting, value):
+                change_setting(session, setting, value)
             case Command.LIST_TABLES:
                 list_tables(metadata)
+            case Command.FLUSH:
+                session.flush()
+                print("Все изменения записаны на диск.")
             case Command.HELP:
                 print_help()
             case Command.EXIT:
-                break
+                return False
             case None:
                 print("Синтаксическая ошибка. Проверьте правильность команды.")
             case unknown_cmd:
                 print(f'Функции "{unknown_cmd}" нет. Попробуйте снова.')
+
+    return True
+
+
+def run_once(cmd: str, session: Session | None = None):
+    """
+    Выполняет одну команду без запуска интерактивного режима.
+
+    Args:
+        cmd (str): Команда в виде строки
+        session (Session, optional): Настройки сеанса
+    """
+
+    session = session or Session()
+    execute(cmd, session)
+    session.close()
+
+
+def run(session: Session | None = None):
+    """
+    Выполняет основной цикл программы: запрашивает команду у пользователя и
+    выполняет её.
+
+    Args:
+        session (Session, optional): Начальные настройки сеанса
+    """
+
+    print_help()
+
+    session = session or Session()
+
+    while execute(get_command_from_user(), session):
+        pass
+
+    session.close()
@@ -0,0 +1,276 @@
+import json
+import os
+import shutil
+from collections import OrderedDict
+
+from .constants import (
+    DB_TABLES_DIR,
+    INDEX_BUCKET_SIZE,
+    INDEX_BUCKETS,
+    INDEX_DIR,
+    INDEX_POOL_SIZE,
+    JSON_EXT,
+)
+from .decorators import handle_file_errors
+from .stats import hash_value
+
+# Поля состояния индекса в метаданных
+BUCKETS_KEY = "buckets"
+ENTRIES_KEY = "entries"
+
+
+def _create_index_dirpath(
+    table_name: str, column: str, datapath: str = DB_TABLES_DIR
+) -> str:
+    """Собирает путь к директории, в которой лежат корзины индекса столбца."""
+    return os.path.join(datapath, table_name, INDEX_DIR, column)
+
+
+def _create_bucket_filepath(table_name: str, column: str, bucket: int) -> str:
+    """
+    Собирает полный путь к файлу корзины индекса. Также создаёт директорию
+    индекса, если она не существует.
+    """
+    index_dirpath = _create_index_dirpath(table_name, column)
+    os.makedirs(index_dirpath, exist_ok=True)
+    return os.path.join(index_dirpath, f"{bucket}{JSON_EXT}")
+
+
+@handle_file_errors
+def load_bucket(table_name: str, column: str, bucket: int) -> dict:
+    """
+    Загружает одну корзину индекса.
+
+    Args:
+        table_name (str): Название таблицы
+        column (str): Название столбца
+        bucket (int): Номер корзины
+    Returns:
+        dict: Корзина {значение в формате JSON : ID}.
+    """
+    with open(
+        _create_bucket_filepath(table_name, column, bucket), "r", encoding="utf-8"
+    ) as json_file:
+        return json.load(json_file)
+
+
+def write_buckets(table_name: str, column: str, buckets: dict[int, dict]):
+    """
+    Записывает корзины индекса на диск. Файлы опустевших корзин удаляются.
+
+    Args:
+        table_name (str): Название таблицы
+        column (str): Название столбца
+        buckets (dict[int, dict]): Корзины {номер : содержимое}
+    """
+    for bucket, entries in buckets.items():
+        filepath = _create_bucket_filepath(table_name, column, bucket)
+        if entries:
+            with open(filepath, "w", encoding="utf-8") as json_file:
+                json_file.write(json.dumps(entries, ensure_ascii=False))
+        elif os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def excess_buckets(state: dict) -> int:
+    """
+    Возвращает количество корзин индекса сверх нужного для его значений:
+    столько корзин уберёт перестроение индекса (vacuum). Корзины не
+    объединяются при удалении записей, поэтому после удалений их может быть
+    больше нужного.
+
+    Args:
+        state (dict): Состояние индекса из метаданных таблицы
+    """
+    needed = max(INDEX_BUCKETS, -(-state[ENTRIES_KEY] // INDEX_BUCKET_SIZE))
+    return max(state[BUCKETS_KEY] - needed, 0)
+
+
+class UniqueIndex:
+    """
+    Хэш-индекс уникального столбца: значение -> ID записи. Значения разложены
+    по корзинам по хэшу, каждая корзина хранится в отдельном файле и
+    загружается только при обращении к ней, поэтому проверка значения читает
+    с диска одну корзину.
+
+    Количество корзин растёт вместе с таблицей (линейное хэширование): когда
+    значений становится больше INDEX_BUCKET_SIZE на корзину в среднем, очередная
+    корзина делится на две, и её значения раскладываются по ним заново. Так
+    корзина в среднем содержит не больше INDEX_BUCKET_SIZE значений, а
+    проверка значения стоит O(1) независимо от размера таблицы; деление одной
+    корзины распределяет стоимость перестроения по вставкам. При удалении
+    записей корзины не объединяются (их количество уменьшает vacuum).
+
+    В памяти держится не больше INDEX_POOL_SIZE корзин без несохранённых
+    изменений: давно не использованные вытесняются, как сегменты в пуле буферов
+    таблицы, поэтому память индекса не зависит от размера таблицы.
+
+    Количество корзин и значений хранится в метаданных таблицы и обновляется на
+    месте. Индекс получает изменения записей от SegmentedTable через apply.
+    """
+
+    def __init__(self, table_name: str, column: str, state: dict, entries: int = 0):
+        """
+        Args:
+            table_name (str): Название таблицы
+            column (str): Название уникального столбца
+            state (dict): Состояние индекса из метаданных таблицы
+            entries (int, optional): Количество значений, если состояния ещё нет
+                (индекс, построенный до появления состояния в метаданных)
+        """
+        self.table_name = table_name
+        self.column = column
+        self._state = state
+        state.setdefault(BUCKETS_KEY, INDEX_BUCKETS)
+        state.setdefault(ENTRIES_KEY, entries)
+        self._buckets = OrderedDict()
+        self._dirty = set()
+        # Копии корзин, забранные collect_dirty, пока их запись на диск не
+        # закончилась: вытесненная корзина загружается из них, а не с диска
+        self._unwritten = {}
+
+    @staticmethod
+    def _encode(value: int | str | bool) -> str:
+        """Переводит значение в ключ корзины (ключи JSON-объекта - строки)."""
+        return json.dumps(value, ensure_ascii=False)
+
+    def _level_size(self) -> int:
+        """
+        Возвращает количество корзин в начале текущего круга делений
+        (INDEX_BUCKETS, умноженное на степень двойки).
+        """
+        rounds = (self._state[BUCKETS_KEY] // INDEX_BUCKETS).bit_length() - 1
+        return INDEX_BUCKETS << rounds
+
+    def _bucket_of(self, value: int | str | bool) -> int:
+        """Возвращает номер корзины, в которую попадает значение."""
+        value_hash = hash_value(value)
+        level_size = self._level_size()
+        bucket = value_hash % level_size
+        # Корзины перед следующей к делению уже разделены в этом круге
+        if bucket < self._state[BUCKETS_KEY] - level_size:
+            bucket = value_hash % (2 * level_size)
+        return bucket
+
+    def _load(self, bucket: int) -> dict:
+        """Возвращает корзину, загружая её с диска при первом обращении."""
+        if bucket in self._buckets:
+            self._buckets.move_to_end(bucket)
+            return self._buckets[bucket]
+
+        unwritten = self._unwritten
+        self._buckets[bucket] = (
+            dict(unwritten[bucket])
+            if bucket in unwritten
+            else load_bucket(self.table_name, self.column, bucket)
+        )
+        self._trim()
+        return self._buckets[bucket]
+
+    def _trim(self):
+        """
+        Вытесняет давно не использованные корзины без несохранённых изменений,
+        пока их больше INDEX_POOL_SIZE. Последняя загруженная корзина не
+        вытесняется.
+        """
+        excess = len(self._buckets) - INDEX_POOL_SIZE
+        for bucket in list(self._buckets)[:-1]:
+            if excess <= 0:
+                break
+            if bucket not in self._dirty:
+                del self._buckets[bucket]
+                excess -= 1
+
+    def _split(self):
+        """
+        Делит очередную корзину: значения, которые по хэшу попадают в новую
+        корзину, переносятся в неё.
+        """
+        level_size = self._level_size()
+        new_bucket = self._state[BUCKETS_KEY]
+        old_bucket = new_bucket - level_size
+
+        entries = self._load(old_bucket)
+        moved = {
+            encoded: key
+            for encoded, key in entries.items()
+            if hash_value(json.loads(encoded)) % (2 * level_size) == new_bucket
+        }
+        for encoded in moved:
+            del entries[encoded]
+
+        self._buckets[new_bucket] = moved
+        self._state[BUCKETS_KEY] = new_bucket + 1
+        self._dirty.update((old_bucket, new_bucket))
+
+    def get(self, value: int | str | bool) -> int | None:
+        """Возвращает ID записи с указанным значением или None."""
+        return self._load(self._bucket_of(value)).get(self._encode(value))
+
+    def apply(self, key: int, old_row: dict | None, new_row: dict | None):
+        """
+        Учитывает изменение записи (см. SegmentedTable.subscribe).
+
+        Args:
+            key (int): Первичный ключ записи
+            old_row (dict or None): Запись до изменения
+            new_row (dict or None): Запись после изменения
+        """
+        old_value = old_row[self.column] if old_row is not None else None
+        new_value = new_row[self.column] if new_row is not None else None
+
+        if old_row is not None and new_row is not None and old_value == new_value:
+            return
+
+        if old_row is not None:
+            bucket = self._bucket_of(old_value)
+            entries = self._load(bucket)
+            if entries.get(self._encode(old_value)) == key:
+                del entries[self._encode(old_value)]
+                self._state[ENTRIES_KEY] -= 1
+                self._dirty.add(bucket)
+
+        if new_row is not None:
+            bucket = self._bucket_of(new_value)
+            entries = self._load(bucket)
+            if self._encode(new_value) not in entries:
+                self._state[ENTRIES_KEY] += 1
+            entries[self._encode(new_value)] = key
+            self._dirty.add(bucket)
+
+            if self._state[ENTRIES_KEY] > self._state[BUCKETS_KEY] * INDEX_BUCKET_SIZE:
+                self._split()
+
+    def collect_dirty(self) -> dict[int, dict]:
+        """
+        Забирает изменённые корзины для записи на диск, после чего корзины
+        считаются сохранёнными и могут вытесняться из памяти.
+
+        Returns:
+            dict[int, dict]: Копии изменённых корзин {номер : содержимое}.
+        """
+        buckets = {bucket: dict(self._buckets[bucket]) for bucket in self._dirty}
+        self._unwritten = buckets
+        self._dirty.clear()
+        self._trim()
+        return buckets
+
+    def clear(self):
+        """Удаляет все значения из индекса вместе с файлами корзин."""
+        shutil.rmtree(
+            _create_index_dirpath(self.table_name, self.column), ignore_errors=True
+        )
+        self._state.update({BUCKETS_KEY: INDEX_BUCKETS, ENTRIES_KEY: 0})
+        self._buckets.clear()
+        self._dirty.clear()
+        self._unwritten = {}
+
+    def write(self, buckets: dict[int, dict]):
+        """Записывает на диск корзины, полученные из collect_dirty."""
+        write_buckets(self.table_name, self.column, buckets)
+        if self._unwritten is buckets:
+            self._unwritten = {}
+
+    def flush(self):
+        """Записывает на диск изменённые корзины."""
+        self.write(self.collect_dirty())
@@ -0,0 +1,259 @@
+import sys
+from collections.abc import Callable, Iterable, Iterator
+
+from .constants import (
+    COLUMN_SEPARATOR,
+    ID_COLUMN_NAME,
+    TABLE_COLUMNS,
+    OutputFormat,
+)
+from .core import check_clause, filter_rows
+from .decorators import handle_db_errors, log_time
+from .output import ROW_WRITERS
+from .storage import SegmentedTable
+
+
+def _resolve_column(
+    metadata: dict, tables: tuple[str, str], name: str
+) -> tuple[str, str] | None:
+    """
+    Определяет, к какой из таблиц относится столбец. Столбец можно указать с
+    названием таблицы ("таблица.столбец") или без него, если он есть только в
+    одной из таблиц. Выводит сообщение при ошибке.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        tables (tuple[str, str]): Названия соединяемых таблиц
+        name (str): Название столбца
+    Returns:
+        tuple[str, str] or None: Пара (таблица, столбец) или None, если столбец не
+            найден или есть в обеих таблицах.
+    """
+    table_name, separator, column = name.partition(COLUMN_SEPARATOR)
+    if separator and table_name in tables:
+        candidates = [(table_name, column)]
+    else:
+        candidates = [(table, name) for table in tables]
+
+    candidates = [
+        (table, column)
+        for table, column in candidates
+        if column in metadata[table][TABLE_COLUMNS]
+    ]
+
+    match candidates:
+        case [resolved]:
+            return resolved
+        case []:
+            print(f'Ошибка: Недопустимое имя столбца "{name}".')
+        case _:
+            print(f'Ошибка: Столбец "{name}" есть в обеих таблицах, укажите таблицу.')
+    return None
+
+
+def _get_value(key: int, data: dict, column: str) -> int | str | bool:
+    """Возвращает значение столбца записи (для ID - первичный ключ)."""
+    return key if column == ID_COLUMN_NAME else data[column]
+
+
+def _hash_join(
+    build_rows: Iterable[tuple[int, dict]],
+    build_column: str,
+    probe_rows: Iterable[tuple[int, dict]],
+    probe_column: str,
+) -> Iterator[tuple[tuple, tuple]]:
+    """
+    Соединяет записи по равенству столбцов: записи build_rows складываются в
+    хэш-таблицу по значению столбца, а записи probe_rows перебираются потоком и
+    ищутся в ней.
+
+    Returns:
+        Iterator[tuple[tuple, tuple]]: Пары ((ключ, запись) из probe_rows,
+            (ключ, запись) из build_rows) с равными значениями столбцов.
+    """
+    hash_table = {}
+    for key, data in build_rows:
+        value = _get_value(key, data, build_column)
+        hash_table.setdefault(value, []).append((key, data))
+
+    for key, data in probe_rows:
+        for match in hash_table.get(_get_value(key, data, probe_column), ()):
+            yield (key, data), match
+
+
+def _is_indexed(table_data: SegmentedTable, column: str) -> bool:
+    """Проверяет, можно ли найти запись по значению столбца без перебора."""
+    return column == ID_COLUMN_NAME or column in table_data.indexes
+
+
+def _index_join(
+    probe_rows: Iterable[tuple[int, dict]],
+    probe_column: str,
+    table_data: SegmentedTable,
+    column: str,
+    where_clause: dict,
+) -> Iterator[tuple[tuple, tuple]]:
+    """
+    Соединяет записи по равенству столбцов, находя пару для каждой записи
+    probe_rows по первичному ключу или индексу уникального столбца таблицы
+    table_data. Хэш-таблица при этом не строится.
+
+    Args:
+        probe_rows (Iterable[tuple[int, dict]]): Пары (ключ, запись) другой таблицы
+        probe_column (str): Столбец соединения другой таблицы
+        table_data (SegmentedTable): Данные таблицы с индексом
+        column (str): Столбец соединения с индексом (или ID)
+        where_clause (dict): Условие для записей таблицы с индексом
+    Returns:
+        Iterator[tuple[tuple, tuple]]: Пары ((ключ, запись) из probe_rows,
+            (ключ, запись) из table_data) с равными значениями столбцов.
+    """
+    for key, data in probe_rows:
+        value = _get_value(key, data, probe_column)
+        if column == ID_COLUMN_NAME:
+            match_key = value if value in table_data else None
+        else:
+            match_key = table_data.indexes[column].get(value)
+        if match_key is None:
+            continue
+
+        match = table_data[match_key]
+        if all(
+            _get_value(match_key, match, filter_column) == filter_value
+            for filter_column, filter_value in where_clause.items()
+        ):
+            yield (key, data), (match_key, match)
+
+
+def _swap(pairs: Iterable[tuple[tuple, tuple]]) -> Iterator[tuple[tuple, tuple]]:
+    """Меняет местами элементы пар, чтобы первой шла запись левой таблицы."""
+    for first, second in pairs:
+        yield second, first
+
+
+@log_time
+@handle_db_errors
+def select_join(
+    metadata: dict,
+    left_table: str,
+    right_table: str,
+    left_data: SegmentedTable,
+    right_data: SegmentedTable,
+    on_clause: tuple[str, str],
+    where_clause: dict = None,
+    cacher: Callable = None,
+    output_format: str = OutputFormat.TABLE,
+):
+    """
+    Выводит записи двух таблиц, соединённые по равенству столбцов (inner join).
+    Столбцы результата называются "таблица.столбец".
+
+    Если столбец соединения одной из таблиц - первичный ключ или уникальный
+    столбец, пара для каждой записи другой таблицы находится по индексу. Иначе
+    соединение выполняется хэшированием: меньшая по количеству записей таблица
+    (по манифесту сегментов) складывается в хэш-таблицу, а большая читается
+    потоком по сегментам. Условие where применяется к своей таблице до
+    соединения.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        left_table (str): Название первой таблицы
+        right_table (str): Название второй таблицы
+        left_data (SegmentedTable): Данные первой таблицы
+        right_data (SegmentedTable): Данные второй таблицы
+        on_clause (tuple[str, str]): Столбцы, по которым соединяются таблицы
+        where_clause (dict or None): Условие для фильтрации (если применимо)
+        cacher (Callable or None): Функция, которая извлекает данные из кэша по ключу
+        output_format (str, optional): Формат вывода (table | tsv | jsonl | csv)
+    """
+
+    tables = (left_table, right_table)
+    if left_table == right_table:
+        print("Ошибка: Соединение таблицы с самой собой не поддерживается.")
+        return
+
+    # KeyError для несуществующей таблицы обработает handle_db_errors
+    left_columns = list(metadata[left_table][TABLE_COLUMNS])
+    right_columns = list(metadata[right_table][TABLE_COLUMNS])
+
+    join_columns = {}
+    for name in on_clause:
+        if (column := _resolve_column(metadata, tables, name)) is None:
+            return
+        table_name, column = column
+        join_columns[table_name] = column
+
+    if len(join_columns) != 2:
+        print("Ошибка: Условие on должно связывать столбцы двух разных таблиц.")
+        return
+
+    left_type = metadata[left_table][TABLE_COLUMNS][join_columns[left_table]]
+    right_type = metadata[right_table][TABLE_COLUMNS][join_columns[right_table]]
+    if left_type != right_type:
+        print("Ошибка: Столбцы в условии on должны иметь одинаковый тип данных.")
+        return
+
+    filters = {left_table: {}, right_table: {}}
+    for name, value in (where_clause or {}).items():
+        if (column := _resolve_column(metadata, tables, name)) is None:
+            return
+        table_name, column = column
+        if not check_clause(metadata, table_name, {column: value}):
+            return
+        filters[table_name][column] = value
+
+    columns = [f"{left_table}{COLUMN_SEPARATOR}{column}" for column in left_columns]
+    columns += [f"{right_table}{COLUMN_SEPARATOR}{column}" for column in right_columns]
+
+    def _join_records() -> Iterator[dict]:
+        left_column = join_columns[left_table]
+        right_column = join_columns[right_table]
+        left_indexed = _is_indexed(left_data, left_column)
+        right_indexed = _is_indexed(right_data, right_column)
+        left_rows = filter_rows(left_data, filters[left_table], stream=True)
+        right_rows = filter_rows(right_data, filters[right_table], stream=True)
+
+        if right_indexed and (not left_indexed or len(left_data) <= len(right_data)):
+            pairs = _index_join(
+                left_rows, left_column, right_data, right_column, filters[right_table]
+            )
+        elif left_indexed:
+            pairs = _swap(
+                _index_join(
+                    right_rows,
+                    right_column,
+                    left_data,
+                    left_column,
+                    filters[left_table],
+                )
+            )
+        elif len(left_data) <= len(right_data):
+            pairs = _swap(_hash_join(left_rows, left_column, right_rows, right_column))
+        else:
+            pairs = _hash_join(right_rows, right_column, left_rows, left_column)
+
+        for (left_key, left_row), (right_key, right_row) in pairs:
+            values = [_get_value(left_key, left_row, c) for c in left_columns]
+            values += [_get_value(right_key, right_row, c) for c in right_columns]
+            yield dict(zip(columns, values))
+
+    if output_format in ROW_WRITERS:
+        ROW_WRITERS[output_format](sys.stdout, columns, _join_records())
+        return
+
+    def _get_from_db():
+        # prettytable нужен только для вывода таблицей - импортируем при вызове
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = columns
+        table.add_rows([list(record.values()) for record in _join_records()])
+        return table
+
+    if cacher:
+        key = (tables, on_clause, frozenset((where_clause or {}).items()))
+        table = cacher(key, _get_from_db)
+    else:
+        table = _get_from_db()
+
+    print(table)
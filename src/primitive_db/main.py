@@ -1,10 +1,61 @@
 #!/usr/bin/env python3
 
-from .engine import run
+import argparse
+
+from .constants import OUTPUT_FORMATS, OutputFormat
+from .engine import Session, run, run_once
+
+
+def _parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(prog="database", description="Учебная база данных")
+    parser.add_argument(
+        "-c",
+        "--command",
+        help="выполнить одну команду и завершить работу (без интерактивного режима)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default=OutputFormat.TABLE,
+        help="формат вывода select (по умолчанию table)",
+    )
+    parser.add_argument(
+        "-s",
+        "--summary",
+        action="store_true",
+        help="выводить для update и delete только количество записей",
+    )
+    parser.add_argument(
+        "-w",
+        "--write-behind",
+        action="store_true",
+        help="записывать изменения на диск в фоновом потоке",
+    )
+    parser.add_argument(
+        "-r",
+        "--record",
+        metavar="ФАЙЛ",
+        help="дописывать выполненные команды и время их выполнения в журнал "
+        "(для database-replay)",
+    )
+    return parser.parse_args()
 
 
 def main():
-    run()
+    args = _parse_args()
+    session = Session(
+        output_format=args.format,
+        summary=args.summary,
+        write_behind=args.write_behind,
+        record=args.record,
+    )
+
+    if args.command is not None:
+        run_once(args.command, session)
+    else:
+        run(session)
 
 
 if __name__ == "__main__":
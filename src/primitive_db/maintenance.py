@@ -0,0 +1,180 @@
+import os
+import shutil
+
+from .constants import (
+    BLOOM_DIR,
+    DB_META_FILE,
+    DB_TABLES_DIR,
+    DICT_DIR,
+    INDEX_DIR,
+    JSON_EXT,
+    JSONL_EXT,
+    SEGMENTS_KEY,
+    TABLE_BLOOM,
+    TABLE_DICTIONARIES,
+    TABLE_STATISTICS,
+    TABLE_STORAGE,
+    TABLE_UNIQUE,
+    TABLE_VIEWS,
+    VIEW_DIR,
+)
+from .decorators import handle_db_errors, log_time
+from .stats import ColumnStatistics
+from .storage import table_disk_size
+from .utils import load_table_data, save_table_data
+
+
+def _remove_path(path: str) -> int:
+    """Удаляет файл или директорию и возвращает количество удалённых файлов."""
+    if os.path.isdir(path):
+        count = sum(len(filenames) for _, _, filenames in os.walk(path))
+        shutil.rmtree(path, ignore_errors=True)
+        return count
+
+    os.remove(path)
+    return 1
+
+
+def _expected_entries(table_metadata: dict) -> tuple[set[str], dict[str, set[str]]]:
+    """
+    Собирает ожидаемое содержимое директории таблицы.
+
+    Returns:
+        tuple[set[str], dict[str, set[str]]]: Файлы сегментов из манифеста и
+            поддиректории словарей, индексов, фильтров и представлений с ожидаемым
+            содержимым.
+    """
+    segment_files = {
+        f"{segment}{JSON_EXT}"
+        for segment in table_metadata[TABLE_STORAGE][SEGMENTS_KEY]
+    }
+    directories = {
+        INDEX_DIR: set(table_metadata.get(TABLE_UNIQUE, [])),
+        BLOOM_DIR: set(table_metadata.get(TABLE_BLOOM, [])),
+        DICT_DIR: {
+            column + JSONL_EXT for column in table_metadata.get(TABLE_DICTIONARIES, [])
+        },
+        VIEW_DIR: set(table_metadata.get(TABLE_VIEWS, {})),
+    }
+    return segment_files, directories
+
+
+def _remove_orphans(metadata: dict, table_names: list[str], whole_db: bool) -> int:
+    """
+    Удаляет из DB_TABLES_DIR файлы, которые не относятся ни к одной таблице:
+    данные удалённых таблиц, сегменты вне манифеста, индексы и фильтры
+    столбцов без соответствующих параметров и результаты удалённых представлений.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_names (list[str]): Таблицы, директории которых нужно проверить
+        whole_db (bool): Проверять также файлы вне директорий таблиц
+    Returns:
+        int: Количество удалённых файлов.
+    """
+    removed = 0
+    if not os.path.isdir(DB_TABLES_DIR):
+        return removed
+
+    if whole_db:
+        for entry in os.listdir(DB_TABLES_DIR):
+            if entry not in metadata:
+                removed += _remove_path(os.path.join(DB_TABLES_DIR, entry))
+
+    for table_name in table_names:
+        table_dirpath = os.path.join(DB_TABLES_DIR, table_name)
+        if not os.path.isdir(table_dirpath):
+            continue
+
+        segment_files, directories = _expected_entries(metadata[table_name])
+        for entry in os.listdir(table_dirpath):
+            path = os.path.join(table_dirpath, entry)
+
+            if entry in directories and os.path.isdir(path):
+                for child in os.listdir(path):
+                    if child not in directories[entry]:
+                        removed += _remove_path(os.path.join(path, child))
+            elif entry not in segment_files or not os.path.isfile(path):
+                removed += _remove_path(path)
+
+    return removed
+
+
+def _vacuum_table(metadata: dict, table_name: str):
+    """
+    Перезаписывает данные таблицы и заново строит статистику, индексы
+    уникальных столбцов, фильтры Блума и представления.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+    """
+    table_data = load_table_data(metadata, table_name)
+    table_data.compact()
+
+    for column_stats in metadata[table_name][TABLE_STATISTICS].values():
+        ColumnStatistics(column_stats).reset()
+    for structure in table_data.side_structures():
+        structure.clear()
+
+    table_data.replay()
+    save_table_data(metadata, table_name, table_data)
+
+
+def _db_disk_size() -> int:
+    """Возвращает размер файлов базы данных на диске в байтах."""
+    total = os.path.getsize(DB_META_FILE) if os.path.exists(DB_META_FILE) else 0
+    if os.path.isdir(DB_TABLES_DIR):
+        for dirpath, _, filenames in os.walk(DB_TABLES_DIR):
+            total += sum(
+                os.path.getsize(os.path.join(dirpath, filename))
+                for filename in filenames
+            )
+    return total
+
+
+@log_time
+@handle_db_errors
+def vacuum(metadata: dict, table_name: str | None = None) -> dict | None:
+    """
+    Обслуживание хранилища: перезаписывает данные таблицы (или всех таблиц) и
+    удаляет лишние файлы. Для каждой таблицы:
+    - сегменты перезаписываются, манифест пересчитывается по данным
+    - из словарей столбцов убираются неиспользуемые значения
+    - статистика, индексы уникальных столбцов и фильтры Блума строятся заново
+      (в фильтрах не остаётся значений удалённых записей)
+
+    Выводит размер данных на диске до и после.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str, optional): Название таблицы. Если не указано,
+            обрабатываются все таблицы, а также удаляются данные таблиц,
+            которых нет в метаданных.
+    Returns:
+        dict (optional): Обновлённые метаданные или None, если таблица не
+        существует.
+    """
+
+    if table_name is not None and table_name not in metadata:
+        raise KeyError(table_name)
+
+    table_names = [table_name] if table_name is not None else list(metadata)
+    whole_db = table_name is None
+
+    sizes_before = {name: table_disk_size(name) for name in table_names}
+    total_before = _db_disk_size()
+
+    for name in table_names:
+        _vacuum_table(metadata, name)
+    removed = _remove_orphans(metadata, table_names, whole_db)
+
+    for name in table_names:
+        print(
+            f'Таблица "{name}": {sizes_before[name]} -> {table_disk_size(name)} байт.'
+        )
+    print(f"Удалено лишних файлов: {removed}.")
+    if whole_db:
+        print(f"Размер базы данных: {total_before} -> {_db_disk_size()} байт.")
+
+    return metadata
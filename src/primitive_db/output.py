@@ -0,0 +1,91 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from .constants import ID_COLUMN_NAME, Bool, OutputFormat
+
+
+def _format_value(value: int | str | bool) -> int | str:
+    """Записывает булевы значения литералами true/false."""
+    if isinstance(value, bool):
+        return Bool.TRUE if value else Bool.FALSE
+    return value
+
+
+def with_keys(rows: Iterable[tuple[int, dict]]) -> Iterator[dict]:
+    """
+    Превращает пары (первичный ключ, запись) в записи с полем ID для вывода.
+
+    Args:
+        rows (Iterable[tuple[int, dict]]): Пары (первичный ключ, запись)
+    Returns:
+        Iterator[dict]: Записи, в которых первым идёт значение ID.
+    """
+    for key, data in rows:
+        yield {ID_COLUMN_NAME: key} | data
+
+
+def write_jsonl(file: TextIO, columns: list[str], records: Iterable[dict]) -> int:
+    """
+    Записывает записи в формате JSON Lines (по одному объекту на строку).
+
+    Args:
+        file (TextIO): Файл или поток для записи
+        columns (list[str]): Выводимые столбцы
+        records (Iterable[dict]): Записи {столбец : значение}
+    Returns:
+        int: Количество записанных записей.
+    """
+    count = 0
+    for record in records:
+        entry = {column: record[column] for column in columns}
+        file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(
+    file: TextIO,
+    columns: list[str],
+    records: Iterable[dict],
+    delimiter: str = ",",
+) -> int:
+    """
+    Записывает записи в формате CSV со строкой заголовка.
+
+    Args:
+        file (TextIO): Файл или поток для записи
+        columns (list[str]): Выводимые столбцы
+        records (Iterable[dict]): Записи {столбец : значение}
+        delimiter (str, optional): Разделитель значений
+    Returns:
+        int: Количество записанных записей.
+    """
+    writer = csv.writer(file, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(columns)
+
+    count = 0
+    for record in records:
+        writer.writerow([_format_value(record[column]) for column in columns])
+        count += 1
+    return count
+
+
+def write_tsv(file: TextIO, columns: list[str], records: Iterable[dict]) -> int:
+    """
+    Записывает записи в формате TSV (значения через табуляцию) со строкой
+    заголовка.
+
+    Returns:
+        int: Количество записанных записей.
+    """
+    return write_csv(file, columns, records, delimiter="\t")
+
+
+# Форматы, которые выводят записи потоком, по одной
+ROW_WRITERS = {
+    OutputFormat.JSONL: write_jsonl,
+    OutputFormat.CSV: write_csv,
+    OutputFormat.TSV: write_tsv,
+}
@@ -1,7 +1,16 @@
 import shlex
 from typing import Optional
 
-from .constants import PLUS_MINUS, Bool, Command, Keyword
+from .constants import (
+    AGGREGATE_FUNCTIONS,
+    ALL_COLUMNS,
+    COLUMN_SEPARATOR,
+    PLUS_MINUS,
+    Aggregate,
+    Bool,
+    Command,
+    Keyword,
+)
 
 
 def _is_unknown(cmd: str) -> bool:
@@ -15,6 +24,7 @@ def _is_unknown(cmd: str) -> bool:
     """
     return cmd not in (
         Command.HELP,
+        Command.FLUSH,
         Command.EXIT,
         Command.LIST_TABLES,
         Command.DROP_TABLE,
@@ -24,6 +34,12 @@ def _is_unknown(cmd: str) -> bool:
         Command.UPDATE,
         Command.DELETE,
         Command.INFO,
+        Command.VACUUM,
+        Command.CREATE_VIEW,
+        Command.DROP_VIEW,
+        Command.EXPORT,
+        Command.IMPORT,
+        Command.SET,
     )
 
 
@@ -112,7 +128,7 @@ def _tokenize(user_input: str) -> Optional[list[str]]:
     """
     try:
         lexer = shlex.shlex(user_input, posix=False)
-        lexer.wordchars += PLUS_MINUS
+        lexer.wordchars += PLUS_MINUS + COLUMN_SEPARATOR
         return list(lexer)
     except ValueError:
         return None
@@ -194,6 +210,159 @@ def _parse_set_clause(user_input: str) -> Optional[dict]:
             return None
 
 
+def _unquote(token: str) -> str:
+    """Убирает кавычки вокруг токена, если они есть."""
+    for quote_char in ('"', "'"):
+        if (value := _as_str(token, quote_char)) is not None:
+            return value
+    return token
+
+
+def _parse_aggregates(tokens: list[str]) -> Optional[list[tuple[str, str]]]:
+    """
+    Разбирает список агрегатных функций вида "count(*), sum(столбец), ...".
+
+    Args:
+        tokens (list[str]): Токены между select и from
+    Returns:
+        list[tuple[str, str]] or None: Пары (функция, столбец) или None при
+            ошибках синтаксиса. Для count(*) столбец равен "*".
+    """
+    aggregates = []
+    rest = tokens
+
+    while rest:
+        match rest:
+            case [func, "(", column, ")", *rest] if func in AGGREGATE_FUNCTIONS:
+                if column == ALL_COLUMNS and func != Aggregate.COUNT:
+                    return None
+                aggregates.append((func, _unquote(column)))
+            case _:
+                return None
+
+        # Функции разделяются запятыми, запятая в конце списка недопустима
+        match rest:
+            case [",", _, *_]:
+                rest = rest[1:]
+            case []:
+                pass
+            case _:
+                return None
+
+    return aggregates or None
+
+
+def _parse_aggregate_select(user_input: str) -> Optional[tuple]:
+    """
+    Разбирает команды вида "select count(*), sum(<столбец>) from <имя_таблицы>
+    [where <столбец> = <значение>] [group by <столбец>]".
+
+    Args:
+        user_input (str): Команда для обработки.
+    Returns:
+        tuple or None: Кортеж (имя_таблицы, агрегаты, условие, столбец_группировки)
+            или None при ошибках синтаксиса. Условие и столбец группировки равны
+            None, если не указаны.
+    """
+    tokens = _tokenize(user_input)
+    if not tokens or Keyword.FROM not in tokens:
+        return None
+
+    from_index = tokens.index(Keyword.FROM)
+    aggregates = _parse_aggregates(tokens[1:from_index])
+    if aggregates is None:
+        return None
+
+    where_clause = group_by = None
+    match tokens[from_index + 1 :]:
+        case [table_name]:
+            pass
+        case [table_name, Keyword.GROUP, Keyword.BY, column]:
+            group_by = column
+        case [table_name, Keyword.WHERE, column, "=", raw_value, *rest]:
+            if (value := _convert_token(raw_value)) is None:
+                return None
+            where_clause = {column: value}
+
+            match rest:
+                case []:
+                    pass
+                case [Keyword.GROUP, Keyword.BY, column]:
+                    group_by = column
+                case _:
+                    return None
+        case _:
+            return None
+
+    group_by = _unquote(group_by) if group_by is not None else None
+    return _unquote(table_name), aggregates, where_clause, group_by
+
+
+def _parse_join_select(user_input: str) -> Optional[tuple]:
+    """
+    Разбирает команды вида "select from <таблица1> join <таблица2> on
+    <таблица1>.<столбец> = <таблица2>.<столбец> [where <столбец> = <значение>]".
+
+    Args:
+        user_input (str): Команда для обработки.
+    Returns:
+        tuple or None: Кортеж (таблица1, таблица2, (столбец1, столбец2), условие)
+            или None при ошибках синтаксиса. Столбцы остаются в том виде, в
+            котором указаны (с названием таблицы или без), условие равно None,
+            если не указано.
+    """
+    match _tokenize(user_input):
+        case [_, _, left_table, _, right_table, Keyword.ON, column1, "=", column2]:
+            where_clause = None
+        case [
+            _,
+            _,
+            left_table,
+            _,
+            right_table,
+            Keyword.ON,
+            column1,
+            "=",
+            column2,
+            Keyword.WHERE,
+            column,
+            "=",
+            raw_value,
+        ]:
+            if (value := _convert_token(raw_value)) is None:
+                return None
+            where_clause = {_unquote(column): value}
+        case _:
+            return None
+
+    on_clause = (_unquote(column1), _unquote(column2))
+    return _unquote(left_table), _unquote(right_table), on_clause, where_clause
+
+
+def _parse_view_query(user_input: str) -> Optional[tuple]:
+    """
+    Разбирает запрос представления из команд вида "create_view
+    <имя_представления> as select ...". Поддерживаются запросы "select from
+    <имя_таблицы> [where ...]" и запросы с агрегатными функциями.
+
+    Args:
+        user_input (str): Команда для обработки.
+    Returns:
+        tuple or None: Кортеж (имя_таблицы, агрегаты, условие, столбец_группировки)
+            или None при ошибках синтаксиса. Для запроса без агрегатных функций
+            агрегаты равны None.
+    """
+    _, _, query = user_input.partition(f" {Keyword.AS} ")
+
+    match parse_command(query.strip()):
+        case (Command.SELECT, table_name, where_clause):
+            return table_name, None, where_clause, None
+        case (Command.SELECT, table_name, aggregates, where_clause, group_by):
+            return table_name, aggregates, where_clause, group_by
+        case _:
+            return None
+
+
 def parse_command(user_input: str) -> Optional[str | tuple]:
     """
     Превращает строку, введённую пользователем, в команду с определёнными
@@ -215,7 +384,10 @@ def parse_command(user_input: str) -> Optional[str | tuple]:
         return None
 
     match tokens:
-        case [Command.HELP | Command.EXIT | Command.LIST_TABLES as cmd, *_]:
+        case [
+            Command.HELP | Command.FLUSH | Command.EXIT | Command.LIST_TABLES as cmd,
+            *_,
+        ]:
             return cmd
         case [Command.DROP_TABLE as cmd, table_name, *_]:
             return cmd, table_name
@@ -226,9 +398,15 @@ def parse_command(user_input: str) -> Optional[str | tuple]:
                 return cmd, table_name, values
         case [Command.SELECT as cmd, Keyword.FROM, table_name]:
             return cmd, table_name, None
+        case [Command.SELECT as cmd, Keyword.FROM, _, Keyword.JOIN, _, *_]:
+            if (parsed := _parse_join_select(user_input)) is not None:
+                return cmd, Keyword.JOIN, *parsed
         case [Command.SELECT as cmd, Keyword.FROM, table_name, *_]:
             if (where_clause := _parse_where_clause(user_input)) is not None:
                 return cmd, table_name, where_clause
+        case [Command.SELECT as cmd, *_]:
+            if (parsed := _parse_aggregate_select(user_input)) is not None:
+                return cmd, *parsed
         case [Command.UPDATE as cmd, table_name, *_]:
             if (set_clause := _parse_set_clause(user_input)) is not None:
                 if (where_clause := _parse_where_clause(user_input)) is not None:
@@ -238,6 +416,24 @@ def parse_command(user_input: str) -> Optional[str | tuple]:
                 return cmd, table_name, where_clause
         case [Command.INFO as cmd, table_name]:
             return cmd, table_name
+        case [Command.VACUUM as cmd]:
+            return cmd, None
+        case [Command.VACUUM as cmd, table_name]:
+            return cmd, table_name
+        case [Command.CREATE_VIEW as cmd, view_name, Keyword.AS, Command.SELECT, *_]:
+            if (query := _parse_view_query(user_input)) is not None:
+                return cmd, view_name, *query
+        case [Command.DROP_VIEW as cmd, view_name]:
+            return cmd, view_name
+        case [Command.EXPORT as cmd, table_name, Keyword.TO, filepath]:
+            return cmd, table_name, filepath, None
+        case [Command.EXPORT as cmd, table_name, Keyword.TO, filepath, *_]:
+            if (where_clause := _parse_where_clause(user_input)) is not None:
+                return cmd, table_name, filepath, where_clause
+        case [Command.IMPORT as cmd, table_name, Keyword.FROM, filepath]:
+            return cmd, table_name, filepath
+        case [Command.SET as cmd, setting, value]:
+            return cmd, setting, value
         case [cmd, *_]:
             return cmd if _is_unknown(cmd) else None
         case _:
@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .constants import RECORD_COMMAND, RECORD_LATENCY, RECORD_TIME
+from .decorators import confirmation_time
+
+
+def load_log(filepath: str) -> list[dict]:
+    """
+    Загружает журнал команд, записанный CommandRecorder.
+
+    Args:
+        filepath (str): Путь к журналу в формате JSON Lines
+    Returns:
+        list[dict]: Записи журнала {"time": ..., "command": ..., "latency": ...}
+            в порядке времени начала команд.
+    """
+    with open(filepath, "r", encoding="utf-8") as log_file:
+        entries = [json.loads(line) for line in log_file if line.strip()]
+    return sorted(entries, key=lambda entry: entry[RECORD_TIME])
+
+
+class CommandRecorder:
+    """
+    Журнал выполненных команд для последующего воспроизведения
+    (database-replay). Для каждой команды в файл дописывается строка JSON с
+    временем начала (секунды Unix), текстом команды и временем выполнения в
+    секундах. Ожидание подтверждения деструктивных команд не учитывается во
+    времени выполнения: при воспроизведении его нет. Файл открывается на
+    дозапись, поэтому в один журнал можно писать из нескольких запусков
+    (например, database -c).
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Args:
+            filepath (str): Путь к журналу в формате JSON Lines
+        """
+        # Построчная буферизация: записанные команды не теряются при аварийном
+        # завершении программы
+        self._file = open(filepath, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, command: str) -> Iterator[None]:
+        """
+        Замеряет время выполнения блока без ожидания подтверждений и
+        записывает команду в журнал.
+
+        Args:
+            command (str): Команда в виде строки
+        """
+        started = time.time()
+        start_time = time.perf_counter()
+        waited = confirmation_time()
+        try:
+            yield
+        finally:
+            latency = time.perf_counter() - start_time
+            entry = {
+                RECORD_TIME: started,
+                RECORD_COMMAND: command,
+                RECORD_LATENCY: latency - (confirmation_time() - waited),
+            }
+            with self._lock:
+                self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def close(self):
+        """Закрывает файл журнала."""
+        self._file.close()
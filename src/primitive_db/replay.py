@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Воспроизведение журнала команд, записанного с параметром database --record.
+
+Команды выполняются на копии директории базы данных (исходная база не
+меняется) в темпе записи или так быстро, как возможно. Несколько
+воспроизводящих потоков выполняют журнал одновременно в одном сеансе, как
+несколько клиентов одной базы. В конце печатается пропускная способность и
+перцентили времени выполнения по типам команд вместе с записанными значениями.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+
+from .constants import (
+    RECORD_COMMAND,
+    RECORD_LATENCY,
+    RECORD_TIME,
+    REPLAY_PERCENTILES,
+)
+from .decorators import confirm_action
+from .engine import Session, execute
+from .recorder import load_log
+
+# Строка отчёта со всеми командами вместе
+TOTAL_KEY = "всего"
+
+
+def _parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="database-replay", description="Воспроизведение журнала команд"
+    )
+    parser.add_argument("log", help="журнал команд (database --record)")
+    parser.add_argument(
+        "database",
+        nargs="?",
+        default=".",
+        help="директория базы данных, копия которой используется "
+        "(по умолчанию текущая)",
+    )
+    parser.add_argument(
+        "-n",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="количество одновременно воспроизводящих журнал потоков",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="темп относительно записанного (2 - вдвое быстрее, "
+        "0 - без пауз между командами)",
+    )
+    parser.add_argument(
+        "-w",
+        "--write-behind",
+        action="store_true",
+        help="записывать изменения на диск в фоновом потоке",
+    )
+    return parser.parse_args()
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Возвращает перцентиль по методу ближайшего ранга (values отсортированы)."""
+    rank = max(round(percent / 100 * len(values)), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+def _command_type(command: str) -> str:
+    """Возвращает тип команды (первое слово) для группировки в отчёте."""
+    return command.split(maxsplit=1)[0] if command.strip() else ""
+
+
+def _group_latencies(pairs: Iterable[tuple[str, float]]) -> dict[str, list[float]]:
+    """
+    Собирает время выполнения (в мс) по типам команд и по всем командам вместе
+    (ключ TOTAL_KEY).
+
+    Args:
+        pairs (Iterable[tuple[str, float]]): Пары (команда, время в секундах)
+    Returns:
+        dict[str, list[float]]: Отсортированные значения по типам команд.
+    """
+    groups = defaultdict(list)
+    for command, latency in pairs:
+        groups[_command_type(command)].append(latency * 1000)
+        groups[TOTAL_KEY].append(latency * 1000)
+    return {command_type: sorted(values) for command_type, values in groups.items()}
+
+
+def _replay(
+    entries: list[dict],
+    session: Session,
+    speed: float,
+    start_time: float,
+    latencies: list[tuple[str, float]],
+):
+    """
+    Выполняет команды журнала по порядку. При speed > 0 перед каждой командой
+    выдерживается пауза, чтобы сохранить интервалы между командами из журнала.
+
+    Args:
+        entries (list[dict]): Записи журнала
+        session (Session): Общий сеанс
+        speed (float): Темп относительно записанного (0 - без пауз)
+        start_time (float): Момент начала воспроизведения (time.perf_counter)
+        latencies (list[tuple[str, float]]): Пары (команда, время выполнения в
+            секундах), дополняется на месте
+    """
+    first_time = entries[0][RECORD_TIME]
+
+    for entry in entries:
+        if speed > 0:
+            delay = (entry[RECORD_TIME] - first_time) / speed
+            time.sleep(max(start_time + delay - time.perf_counter(), 0))
+
+        command = entry[RECORD_COMMAND]
+        command_start = time.perf_counter()
+        execute(command, session)
+        latencies.append((command, time.perf_counter() - command_start))
+
+
+def _report(entries: list[dict], latencies: list[tuple[str, float]], elapsed: float):
+    """
+    Печатает пропускную способность и перцентили времени выполнения (в мс)
+    воспроизведённых и записанных команд по типам команд.
+
+    Args:
+        entries (list[dict]): Записи журнала
+        latencies (list[tuple[str, float]]): Пары (команда, время выполнения в
+            секундах) всех воспроизводящих потоков
+        elapsed (float): Общее время воспроизведения в секундах
+    """
+    replayed = _group_latencies(latencies)
+    recorded = _group_latencies(
+        (entry[RECORD_COMMAND], entry[RECORD_LATENCY]) for entry in entries
+    )
+
+    print(
+        f"Выполнено команд: {len(latencies)} за {elapsed:.2f} с "
+        f"({len(latencies) / elapsed:.1f} в секунду)"
+    )
+
+    headers = [f"p{percent}" for percent in REPLAY_PERCENTILES]
+    print(
+        f"{'команда':<14}{'кол-во':>8}{'среднее':>10}"
+        + "".join(f"{header:>10}" for header in [*headers, "max"])
+        + f"   записано {'/'.join(headers)}"
+    )
+
+    for command_type, values in sorted(
+        replayed.items(), key=lambda item: (item[0] == TOTAL_KEY, item[0])
+    ):
+        percentiles = [_percentile(values, percent) for percent in REPLAY_PERCENTILES]
+        recorded_percentiles = "/".join(
+            f"{_percentile(recorded[command_type], percent):.2f}"
+            for percent in REPLAY_PERCENTILES
+        )
+        print(
+            f"{command_type:<14}{len(values):>8}{statistics.mean(values):>10.2f}"
+            + "".join(f"{value:>10.2f}" for value in [*percentiles, values[-1]])
+            + f"   {recorded_percentiles}"
+        )
+
+
+def main():
+    args = _parse_args()
+    entries = load_log(args.log)
+    if not entries:
+        print("Журнал команд пуст.")
+        return
+
+    # Деструктивные команды в журнале уже были подтверждены при записи
+    confirm_action.assume_yes = True
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        database = os.path.join(workdir, "db")
+        shutil.copytree(args.database, database)
+        os.chdir(database)
+
+        session = Session(summary=True, write_behind=args.write_behind)
+        latencies = [[] for _ in range(args.concurrency)]
+        start_time = time.perf_counter()
+        replayers = [
+            threading.Thread(
+                target=_replay,
+                args=(entries, session, args.speed, start_time, replayer_latencies),
+            )
+            for replayer_latencies in latencies
+        ]
+
+        # Вывод команд не нужен для замеров - подавляем его
+        with open(os.devnull, "w") as devnull:
+            with (
+                contextlib.redirect_stdout(devnull),
+                contextlib.redirect_stderr(devnull),
+            ):
+                for replayer in replayers:
+                    replayer.start()
+                for replayer in replayers:
+                    replayer.join()
+                session.close()
+
+        elapsed = time.perf_counter() - start_time
+        os.chdir(cwd)
+
+    _report(entries, [pair for pairs in latencies for pair in pairs], elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from collections.abc import Iterable
+
+from .constants import ID_COLUMN_NAME, SUPPORTED_DATA_TYPES, TABLE_COLUMNS
+
+# Скомпилированные схемы по содержимому схемы таблицы. Ключ включает названия и
+# типы столбцов, поэтому после изменения схемы (drop_table + create_table)
+# используется новая запись.
+_SCHEMAS = {}
+
+
+class TableSchema:
+    """
+    Схема таблицы, подготовленная для быстрой проверки записей. Для каждого
+    столбца заранее вычисляются допустимые типы значений, поэтому проверка
+    записи не обращается к метаданным и SUPPORTED_DATA_TYPES.
+    """
+
+    __slots__ = ("columns", "data_columns", "_checks", "_type_names")
+
+    def __init__(self, columns: dict):
+        """
+        Args:
+            columns (dict): Схема таблицы {столбец : тип}
+        """
+        self.columns = tuple(columns)
+        # Столбцы, значения которых хранятся в записи (все, кроме ID)
+        self.data_columns = tuple(
+            column for column in columns if column != ID_COLUMN_NAME
+        )
+        self._type_names = dict(columns)
+        self._checks = {
+            column: (
+                SUPPORTED_DATA_TYPES[type_name],
+                # Точные типы проверяются по type() без isinstance. bool - подкласс
+                # int, поэтому для int-столбцов он допускается, как и раньше.
+                frozenset(
+                    data_type
+                    for data_type in SUPPORTED_DATA_TYPES.values()
+                    if issubclass(data_type, SUPPORTED_DATA_TYPES[type_name])
+                ),
+            )
+            for column, type_name in columns.items()
+        }
+
+    def check(self, clause: dict, show_column_index: bool = False) -> bool:
+        """
+        Проверяет пары {столбец : значение} на соответствие схеме. Выводит
+        сообщение при ошибке.
+
+        Args:
+            clause (dict): Словарь
+            show_column_index (bool, optional): Указывать номер столбца в тексте ошибки
+        """
+        checks = self._checks
+
+        for i, (column, value) in enumerate(clause.items(), start=1):
+            check = checks.get(column)
+            if check is None:
+                print(f'Ошибка: Недопустимое имя столбца "{column}".')
+                return False
+
+            data_type, exact_types = check
+            if type(value) not in exact_types and not isinstance(value, data_type):
+                column_index = f"#{i} " if show_column_index else ""
+                print(
+                    "Ошибка: Неверный тип данных для столбца "
+                    f'{column_index}"{column}". '
+                    f"Ожидается {self._type_names[column]}."
+                )
+                return False
+
+        return True
+
+    def make_entry(self, values: Iterable[int | str | bool]) -> dict | None:
+        """
+        Собирает новую запись из значений в порядке столбцов таблицы (без ID) и
+        проверяет её. Выводит сообщение при ошибке.
+
+        Args:
+            values (Iterable[int or str or bool]): Значения столбцов
+        Returns:
+            dict or None: Запись {столбец : значение} или None при ошибке.
+        """
+        values = list(values)
+
+        if len(values) != len(self.data_columns):
+            print("Ошибка: Передано неверное количество значений.")
+            return None
+
+        entry = dict(zip(self.data_columns, values))
+        if not self.check(entry, show_column_index=True):
+            return None
+
+        return entry
+
+
+def get_schema(metadata: dict, table_name: str) -> TableSchema:
+    """
+    Возвращает скомпилированную схему таблицы. Схема собирается один раз и
+    переиспользуется, пока не изменятся столбцы таблицы.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+    Returns:
+        TableSchema: Схема таблицы.
+    """
+    columns = metadata[table_name][TABLE_COLUMNS]
+    key = (table_name, tuple(columns.items()))
+
+    if (schema := _SCHEMAS.get(key)) is None:
+        schema = _SCHEMAS[key] = TableSchema(columns)
+
+    return schema
@@ -0,0 +1,165 @@
+import hashlib
+from bisect import insort
+from collections.abc import Iterable
+
+from .constants import DISTINCT_SKETCH_SIZE, ID_COLUMN_NAME
+
+# Размер хэша значения в байтах и размер пространства его значений
+HASH_SIZE = 4
+HASH_SPACE = 2 ** (HASH_SIZE * 8)
+
+# Поля статистики столбца в метаданных
+MIN_KEY = "min"
+MAX_KEY = "max"
+EXACT_KEY = "exact"
+SKETCH_KEY = "sketch"
+STALE_KEY = "stale"
+
+
+def hash_value(value: int | str | bool) -> int:
+    """
+    Возвращает хэш значения, одинаковый между запусками программы (встроенный
+    hash для строк меняется от запуска к запуску).
+    """
+    digest = hashlib.blake2b(repr(value).encode("utf-8"), digest_size=HASH_SIZE)
+    return int.from_bytes(digest.digest(), "big")
+
+
+class ColumnStatistics:
+    """
+    Статистика по значениям столбца: минимум, максимум и оценка количества
+    различных значений. Хранится в метаданных таблицы и обновляется на месте.
+
+    Количество различных значений оценивается по DISTINCT_SKETCH_SIZE наименьшим
+    хэшам значений (KMV-оценка). При удалении значения, равного минимуму или
+    максимуму, границы перестают быть точными (exact = False) до перестроения
+    статистики. Также считается количество удалённых и заменённых значений
+    (stale): они остаются в фильтрах Блума столбца до перестроения (vacuum).
+    """
+
+    def __init__(self, stats: dict):
+        """
+        Args:
+            stats (dict): Словарь статистики столбца из метаданных таблицы.
+        """
+        self._stats = stats
+        stats.setdefault(MIN_KEY, None)
+        stats.setdefault(MAX_KEY, None)
+        stats.setdefault(EXACT_KEY, True)
+        stats.setdefault(SKETCH_KEY, [])
+        stats.setdefault(STALE_KEY, 0)
+
+    @property
+    def min(self) -> int | str | bool | None:
+        return self._stats[MIN_KEY]
+
+    @property
+    def max(self) -> int | str | bool | None:
+        return self._stats[MAX_KEY]
+
+    @property
+    def exact(self) -> bool:
+        """True, если минимум и максимум совпадают с реальными значениями."""
+        return self._stats[EXACT_KEY]
+
+    @property
+    def stale(self) -> int:
+        """Количество удалённых значений с последнего перестроения статистики."""
+        return self._stats[STALE_KEY]
+
+    @property
+    def distinct(self) -> int:
+        """Оценка количества различных значений в столбце."""
+        sketch = self._stats[SKETCH_KEY]
+        if len(sketch) < DISTINCT_SKETCH_SIZE:
+            return len(sketch)
+        return round((DISTINCT_SKETCH_SIZE - 1) * HASH_SPACE / (sketch[-1] + 1))
+
+    def add(self, value: int | str | bool):
+        """Учитывает новое значение в статистике."""
+        stats = self._stats
+        if stats[MIN_KEY] is None or value < stats[MIN_KEY]:
+            stats[MIN_KEY] = value
+        if stats[MAX_KEY] is None or value > stats[MAX_KEY]:
+            stats[MAX_KEY] = value
+
+        sketch = stats[SKETCH_KEY]
+        value_hash = hash_value(value)
+        if value_hash in sketch:
+            return
+        if len(sketch) < DISTINCT_SKETCH_SIZE:
+            insort(sketch, value_hash)
+        elif value_hash < sketch[-1]:
+            insort(sketch, value_hash)
+            sketch.pop()
+
+    def remove(self, value: int | str | bool):
+        """Учитывает удаление значения: границы могут стать неточными."""
+        self._stats[STALE_KEY] += 1
+        if value == self._stats[MIN_KEY] or value == self._stats[MAX_KEY]:
+            self._stats[EXACT_KEY] = False
+
+    def reset(self):
+        """Очищает статистику столбца."""
+        self._stats.update(
+            {MIN_KEY: None, MAX_KEY: None, EXACT_KEY: True, STALE_KEY: 0}
+        )
+        self._stats[SKETCH_KEY] = []
+
+
+class TableStatistics:
+    """
+    Статистика по всем столбцам таблицы (включая ID). Получает изменения
+    записей от SegmentedTable через apply.
+    """
+
+    def __init__(self, stats: dict, columns: Iterable[str]):
+        """
+        Args:
+            stats (dict): Статистика {столбец : статистика} из метаданных таблицы
+            columns (Iterable[str]): Столбцы таблицы
+        """
+        self._columns = {
+            column: ColumnStatistics(stats.setdefault(column, {})) for column in columns
+        }
+
+    def __getitem__(self, column: str) -> ColumnStatistics:
+        return self._columns[column]
+
+    def apply(self, key: int, old_row: dict | None, new_row: dict | None):
+        """
+        Учитывает изменение записи. Для новой записи old_row равен None, для
+        удалённой - new_row.
+
+        Args:
+            key (int): Первичный ключ записи
+            old_row (dict or None): Запись до изменения
+            new_row (dict or None): Запись после изменения
+        """
+        for column, column_stats in self._columns.items():
+            if column == ID_COLUMN_NAME:
+                old_value = key if old_row is not None else None
+                new_value = key if new_row is not None else None
+            else:
+                old_value = old_row[column] if old_row is not None else None
+                new_value = new_row[column] if new_row is not None else None
+
+            if old_row is not None and new_row is not None and old_value == new_value:
+                continue
+            if old_row is not None:
+                column_stats.remove(old_value)
+            if new_row is not None:
+                column_stats.add(new_value)
+
+    def rebuild(self, rows: Iterable[tuple[int, dict]]):
+        """
+        Перестраивает статистику по всем записям таблицы.
+
+        Args:
+            rows (Iterable[tuple[int, dict]]): Пары (первичный ключ, запись)
+        """
+        for column_stats in self._columns.values():
+            column_stats.reset()
+
+        for key, row in rows:
+            self.apply(key, None, row)
@@ -0,0 +1,679 @@
+import json
+import os
+import shutil
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, MutableMapping
+
+from .constants import (
+    BUFFER_POOL_SIZE,
+    DB_TABLES_DIR,
+    DICT_DIR,
+    DICT_MAX_VALUES,
+    ID_COLUMN_DATA_TYPE,
+    ID_INITIAL_VALUE,
+    JSON_EXT,
+    JSONL_EXT,
+    SEGMENT_SIZE,
+    SEGMENT_SIZE_KEY,
+    SEGMENTS_KEY,
+)
+from .decorators import handle_file_errors
+
+
+def create_manifest(segment_size: int = SEGMENT_SIZE) -> dict:
+    """
+    Создаёт пустой манифест сегментов для новой таблицы.
+
+    Args:
+        segment_size (int, optional): Количество ID, которое покрывает один сегмент.
+    Returns:
+        dict: Манифест вида {"segment_size": ..., "segments": {}}.
+    """
+    return {SEGMENT_SIZE_KEY: segment_size, SEGMENTS_KEY: {}}
+
+
+def _create_table_dirpath(table_name: str, datapath: str = DB_TABLES_DIR) -> str:
+    """Собирает путь к директории, в которой лежат сегменты таблицы."""
+    return os.path.join(datapath, table_name)
+
+
+def _create_segment_filepath(table_name: str, segment: int) -> str:
+    """
+    Собирает полный путь к файлу сегмента. Также создаёт директорию таблицы,
+    если она не существует.
+    """
+    table_dirpath = _create_table_dirpath(table_name)
+    os.makedirs(table_dirpath, exist_ok=True)
+    return os.path.join(table_dirpath, f"{segment}{JSON_EXT}")
+
+
+@handle_file_errors
+def load_segment(table_name: str, segment: int) -> dict:
+    """
+    Загружает записи одного сегмента таблицы.
+
+    Args:
+        table_name (str): Название таблицы
+        segment (int): Номер сегмента
+    Returns:
+        dict: Записи сегмента (ключи - ID в строковом виде).
+    """
+    with open(
+        _create_segment_filepath(table_name, segment), "r", encoding="utf-8"
+    ) as json_file:
+        return json.load(json_file)
+
+
+def save_segment(table_name: str, segment: int, rows: dict):
+    """
+    Сохраняет записи одного сегмента таблицы.
+
+    Args:
+        table_name (str): Название таблицы
+        segment (int): Номер сегмента
+        rows (dict): Записи сегмента
+    """
+    with open(
+        _create_segment_filepath(table_name, segment), "w", encoding="utf-8"
+    ) as json_file:
+        json.dump(rows, json_file, ensure_ascii=False, indent=2)
+
+
+def remove_segment(table_name: str, segment: int):
+    """Удаляет файл сегмента, если он существует."""
+    try:
+        os.remove(_create_segment_filepath(table_name, segment))
+    except FileNotFoundError:
+        pass
+
+
+def write_segments(table_name: str, segments: dict[int, dict | None]):
+    """
+    Записывает сегменты таблицы на диск.
+
+    Args:
+        table_name (str): Название таблицы
+        segments (dict[int, dict or None]): Записи сегментов {номер : записи},
+            для None файл сегмента удаляется.
+    """
+    for segment, rows in segments.items():
+        if rows:
+            save_segment(table_name, segment, rows)
+        else:
+            remove_segment(table_name, segment)
+
+
+def _create_dictionary_filepath(table_name: str, column: str) -> str:
+    """
+    Собирает полный путь к файлу словаря столбца. Также создаёт директорию
+    словарей таблицы, если она не существует.
+    """
+    dict_dirpath = os.path.join(_create_table_dirpath(table_name), DICT_DIR)
+    os.makedirs(dict_dirpath, exist_ok=True)
+    return os.path.join(dict_dirpath, column + JSONL_EXT)
+
+
+def load_dictionary(table_name: str, column: str) -> list[str]:
+    """
+    Загружает значения словаря столбца.
+
+    Args:
+        table_name (str): Название таблицы
+        column (str): Название столбца
+    Returns:
+        list[str]: Значения в порядке кодов или [], если файла словаря нет.
+    """
+    try:
+        with open(
+            _create_dictionary_filepath(table_name, column), "r", encoding="utf-8"
+        ) as dict_file:
+            return [json.loads(line) for line in dict_file if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def write_dictionary(table_name: str, column: str, start: int, values: list[str]):
+    """
+    Записывает значения словаря столбца в файл (по одному значению JSON в
+    строке).
+
+    Args:
+        table_name (str): Название таблицы
+        column (str): Название столбца
+        start (int): Код первого значения. Значения с кодом start и дальше
+            дописываются в конец файла, при start = 0 файл перезаписывается.
+        values (list[str]): Значения, начиная с кода start
+    """
+    with open(
+        _create_dictionary_filepath(table_name, column),
+        "w" if start == 0 else "a",
+        encoding="utf-8",
+    ) as dict_file:
+        dict_file.writelines(
+            json.dumps(value, ensure_ascii=False) + "\n" for value in values
+        )
+
+
+def remove_table_segments(table_name: str):
+    """Удаляет директорию со всеми сегментами таблицы."""
+    shutil.rmtree(_create_table_dirpath(table_name), ignore_errors=True)
+
+
+def table_disk_size(table_name: str) -> int:
+    """
+    Возвращает размер всех файлов таблицы на диске (сегменты, индексы и
+    фильтры) в байтах.
+
+    Args:
+        table_name (str): Название таблицы
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(_create_table_dirpath(table_name)):
+        total += sum(
+            os.path.getsize(os.path.join(dirpath, filename)) for filename in filenames
+        )
+    return total
+
+
+class ColumnDictionary:
+    """
+    Словарь значений строкового столбца: в записях хранится номер значения
+    (код), а сами строки - один раз в списке values. Список хранится в файле
+    data/<таблица>/dict/<столбец>.jsonl: значения только добавляются, поэтому
+    при сохранении новые значения дописываются в конец файла, а весь файл
+    перезаписывается только после перенумерации (replace).
+
+    Если в словаре больше DICT_MAX_VALUES значений и в него добавляется новое,
+    поднимается флаг overflowed: словарное кодирование не подходит для столбца
+    с таким количеством различных значений.
+    """
+
+    def __init__(self, table_name: str, column: str, values: list[str] | None = None):
+        """
+        Args:
+            table_name (str): Название таблицы
+            column (str): Название столбца
+            values (list[str], optional): Значения нового словаря (код значения -
+                его индекс). Если не указаны, словарь загружается из файла.
+        """
+        self.table_name = table_name
+        self.column = column
+        self.overflowed = False
+
+        if values is None:
+            self.replace(load_dictionary(table_name, column))
+            self._rewrite = False
+        else:
+            self.replace(values)
+
+    def lookup(self, value: str) -> int | None:
+        """Возвращает код значения или None, если значения нет в словаре."""
+        return self._codes.get(value)
+
+    def encode(self, value: str) -> int:
+        """Возвращает код значения, добавляя его в словарь при необходимости."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            if code >= DICT_MAX_VALUES:
+                self.overflowed = True
+        return code
+
+    def decode(self, code: int) -> str:
+        """Возвращает значение по коду."""
+        return self.values[code]
+
+    def replace(self, values: list[str]):
+        """Заменяет все значения словаря (файл перезапишется при сохранении)."""
+        self.values = values
+        self._codes = {value: code for code, value in enumerate(values)}
+        # Количество значений, которые уже записаны в файл, и нужно ли
+        # перезаписать файл целиком
+        self._written = len(values)
+        self._rewrite = True
+
+    def collect_dirty(self) -> tuple[int, list[str]] | None:
+        """
+        Забирает значения, которых ещё нет в файле, после чего они считаются
+        сохранёнными.
+
+        Returns:
+            tuple[int, list[str]] or None: Код первого нового значения и новые
+                значения или None, если файл не изменился.
+        """
+        if not self._rewrite and self._written == len(self.values):
+            return None
+
+        start = 0 if self._rewrite else self._written
+        self._written = len(self.values)
+        self._rewrite = False
+        return start, self.values[start:]
+
+    def write(self, changes: tuple[int, list[str]] | None):
+        """Записывает в файл значения, полученные из collect_dirty."""
+        if changes is not None:
+            write_dictionary(self.table_name, self.column, *changes)
+
+
+class SegmentedTable(MutableMapping):
+    """
+    Данные таблицы, разбитые на сегменты по диапазону первичного ключа. Сегмент с
+    номером N хранит записи с ID от N * segment_size + 1 до (N + 1) * segment_size
+    в отдельном файле.
+
+    Сегменты загружаются с диска только при обращении к ним, а при сохранении
+    (flush) записываются только изменённые. Количество записей в каждом сегменте
+    хранится в манифесте, поэтому длина таблицы известна без чтения данных.
+
+    Значения столбцов со словарным кодированием хранятся (на диске и в памяти)
+    в виде кодов и декодируются при чтении записи по ключу.
+
+    Подписчики (subscribe) получают каждое изменение записи в виде
+    (ключ, запись до изменения, запись после изменения).
+
+    В памяти одновременно держится не больше pool_size сегментов (пул буферов):
+    при загрузке нового сегмента давно не использованные вытесняются, а
+    изменённые перед вытеснением записываются на диск (если write_back).
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        manifest: dict,
+        dictionaries: list[str] | None = None,
+        pool_size: int = BUFFER_POOL_SIZE,
+    ):
+        """
+        Args:
+            table_name (str): Название таблицы
+            manifest (dict): Манифест сегментов из метаданных таблицы. Изменяется
+                на месте при добавлении и удалении записей.
+            dictionaries (list[str], optional): Столбцы со словарным
+                кодированием из метаданных таблицы. Дополняется на месте.
+            pool_size (int, optional): Наибольшее количество сегментов в памяти
+        """
+        self.table_name = table_name
+        self._segment_size = manifest[SEGMENT_SIZE_KEY]
+        self._counts = manifest[SEGMENTS_KEY]
+        self._dictionaries = dictionaries if dictionaries is not None else []
+        self._codecs = {
+            column: ColumnDictionary(table_name, column)
+            for column in self._dictionaries
+        }
+        self._segments = OrderedDict()
+        self._pool_size = pool_size
+        self._dirty = set()
+        # Сегменты, изменения которых забраны collect_dirty, но ещё не записаны на
+        # диск: их нельзя вытеснять, иначе _load прочитает старый файл
+        self._in_flight = set()
+        self._listeners = []
+        # Записывать изменённые сегменты при вытеснении. Отключается, если
+        # запись на диск выполняет кто-то другой (отложенная запись): тогда
+        # изменённые сегменты остаются в памяти до flush.
+        self.write_back = True
+        # Индексы уникальных столбцов и фильтры Блума {столбец : индекс} и
+        # материализованные представления {название : представление}
+        self.indexes = {}
+        self.filters = {}
+        self.views = {}
+
+    def subscribe(self, listener: Callable[[int, dict | None, dict | None], None]):
+        """
+        Добавляет подписчика на изменения записей. Для новой записи запись до
+        изменения равна None, для удалённой - запись после изменения.
+
+        Args:
+            listener (Callable): Функция (ключ, старая запись, новая запись)
+        """
+        self._listeners.append(listener)
+
+    def attach_index(self, index):
+        """
+        Подключает индекс столбца: он получает изменения записей и сохраняется
+        вместе с таблицей (flush).
+
+        Args:
+            index (UniqueIndex): Индекс уникального столбца
+        """
+        self.indexes[index.column] = index
+        self.subscribe(index.apply)
+
+    def attach_filter(self, bloom_filter):
+        """
+        Подключает фильтры Блума столбца: они получают изменения записей и
+        сохраняются вместе с таблицей (flush).
+
+        Args:
+            bloom_filter (SegmentBloomFilter): Фильтры Блума столбца
+        """
+        self.filters[bloom_filter.column] = bloom_filter
+        self.subscribe(bloom_filter.apply)
+
+    def attach_view(self, view):
+        """
+        Подключает материализованное представление: оно получает изменения
+        записей и сохраняется вместе с таблицей (flush).
+
+        Args:
+            view (MaterializedView): Представление по таблице
+        """
+        self.views[view.name] = view
+        self.subscribe(view.apply)
+
+    def side_structures(self) -> list:
+        """Возвращает подключённые индексы, фильтры Блума и представления."""
+        return [*self.indexes.values(), *self.filters.values(), *self.views.values()]
+
+    def _notify(self, key: int, old_row: dict | None, new_row: dict | None):
+        """Сообщает подписчикам об изменении записи."""
+        for listener in self._listeners:
+            listener(key, old_row, new_row)
+
+    def _segment_of(self, key: int | str) -> int:
+        """Возвращает номер сегмента, в который попадает ID."""
+        return (ID_COLUMN_DATA_TYPE(key) - ID_INITIAL_VALUE) // self._segment_size
+
+    def segments(self) -> list[int]:
+        """Возвращает номера непустых сегментов по возрастанию."""
+        return sorted(int(segment) for segment in self._counts)
+
+    def _load(self, segment: int) -> dict:
+        """
+        Возвращает записи сегмента, загружая их с диска при первом обращении.
+        Сегмент становится последним использованным в пуле.
+        """
+        if segment in self._segments:
+            self._segments.move_to_end(segment)
+            return self._segments[segment]
+
+        rows = (
+            load_segment(self.table_name, segment)
+            if str(segment) in self._counts
+            else {}
+        )
+        self._segments[segment] = {
+            ID_COLUMN_DATA_TYPE(key): row for key, row in rows.items()
+        }
+        self._trim()
+        return self._segments[segment]
+
+    def _trim(self):
+        """
+        Вытесняет давно не использованные сегменты, пока их больше pool_size.
+        Последний загруженный сегмент и сегменты, которые ещё записываются на
+        диск, не вытесняются.
+        """
+        excess = len(self._segments) - self._pool_size
+        for segment in list(self._segments)[:-1]:
+            if excess <= 0:
+                break
+            if segment in self._in_flight:
+                continue
+            if segment in self._dirty:
+                if not self.write_back:
+                    continue
+                self.write_dictionaries(self.collect_dictionaries())
+                write_segments(self.table_name, self._collect_segment(segment))
+            del self._segments[segment]
+            excess -= 1
+
+    def get_raw(self, key: int | str) -> dict:
+        """Возвращает запись по ключу без декодирования значений."""
+        return self._load(self._segment_of(key))[ID_COLUMN_DATA_TYPE(key)]
+
+    def decode(self, row: dict) -> dict:
+        """
+        Заменяет коды в записи на значения из словарей столбцов. Всегда
+        возвращает новый словарь, чтобы изменения записи проходили через
+        __setitem__.
+        """
+        row = dict(row)
+        for column, codec in self._codecs.items():
+            row[column] = codec.decode(row[column])
+        return row
+
+    def encode(self, row: dict) -> dict:
+        """Заменяет значения столбцов со словарным кодированием на коды."""
+        if not self._codecs:
+            return row
+        row = dict(row)
+        for column, codec in self._codecs.items():
+            row[column] = codec.encode(row[column])
+        return row
+
+    def encode_clause(self, clause: dict) -> dict | None:
+        """
+        Переводит условие {столбец : значение} в коды для сравнения с записями
+        без декодирования.
+
+        Returns:
+            dict or None: Условие с кодами или None, если какого-то значения нет
+                в словаре (тогда условию не удовлетворяет ни одна запись).
+        """
+        encoded = {}
+        for column, value in clause.items():
+            if column in self._codecs:
+                value = self._codecs[column].lookup(value)
+                if value is None:
+                    return None
+            encoded[column] = value
+        return encoded
+
+    def __getitem__(self, key: int | str) -> dict:
+        return self.decode(self.get_raw(key))
+
+    def __setitem__(self, key: int | str, row: dict):
+        segment = self._segment_of(key)
+        rows = self._load(segment)
+        key = ID_COLUMN_DATA_TYPE(key)
+
+        if key in rows:
+            old_row = self.decode(rows[key])
+        else:
+            old_row = None
+            self._counts[str(segment)] = self._counts.get(str(segment), 0) + 1
+
+        rows[key] = self.encode(row)
+        self._dirty.add(segment)
+        self._notify(key, old_row, row)
+
+    def __delitem__(self, key: int | str):
+        segment = self._segment_of(key)
+        key = ID_COLUMN_DATA_TYPE(key)
+        old_row = self.decode(self._load(segment).pop(key))
+        self._counts[str(segment)] -= 1
+        self._dirty.add(segment)
+        self._notify(key, old_row, None)
+
+    def __iter__(self) -> Iterator[int]:
+        for segment in self.segments():
+            yield from list(self._load(segment))
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def scan(
+        self, retain: bool = False, segments: Iterable[int] | None = None
+    ) -> Iterator[tuple[int, dict]]:
+        """
+        Перебирает пары (ID, запись без декодирования) по сегментам. Уже
+        загруженные сегменты берутся из памяти.
+
+        Args:
+            retain (bool, optional): Оставлять прочитанные с диска сегменты в
+                памяти для последующих обращений по ключу.
+            segments (Iterable[int], optional): Читать только эти сегменты
+        """
+        numbers = self.segments()
+        if segments is not None:
+            numbers = sorted(set(numbers).intersection(segments))
+
+        for segment in numbers:
+            rows = self._segments.get(segment)
+            if rows is None and retain:
+                rows = self._load(segment)
+            elif rows is None:
+                rows = {
+                    ID_COLUMN_DATA_TYPE(key): row
+                    for key, row in load_segment(self.table_name, segment).items()
+                }
+            yield from list(rows.items())
+
+    def add_dictionary(self, column: str):
+        """
+        Включает словарное кодирование для столбца. Уже сохранённые записи
+        перекодируются посегментно и сразу записываются на диск.
+
+        Args:
+            column (str): Название строкового столбца
+        """
+        if column in self._codecs:
+            return
+
+        codec = ColumnDictionary(self.table_name, column, [])
+        for segment in self.segments():
+            for row in self._load(segment).values():
+                row[column] = codec.encode(row[column])
+            self._dirty.add(segment)
+            codec.write(codec.collect_dirty())
+            self.flush()
+            self.evict()
+
+        codec.write(codec.collect_dirty())
+        self._codecs[column] = codec
+        self._dictionaries.append(column)
+
+    def compact(self):
+        """
+        Перезаписывает все сегменты таблицы по одному: из словарей столбцов
+        убираются значения, которых больше нет в записях (коды назначаются
+        заново), а количество записей в манифесте пересчитывается по данным.
+        """
+        self.flush()
+
+        used = {column: set() for column in self._codecs}
+        for _, row in self.scan():
+            for column, codes in used.items():
+                codes.add(row[column])
+
+        remap = {}
+        for column, codes in used.items():
+            codec = self._codecs[column]
+            kept = sorted(codes)
+            remap[column] = {old: new for new, old in enumerate(kept)}
+            codec.replace([codec.values[code] for code in kept])
+
+        self.evict()
+        for segment in self.segments():
+            rows = self._load(segment)
+            for row in rows.values():
+                for column, codes in remap.items():
+                    row[column] = codes[row[column]]
+
+            self._counts[str(segment)] = len(rows)
+            self._dirty.add(segment)
+            self.flush()
+            self.evict()
+
+    def replay(self):
+        """
+        Передаёт подписчикам все записи таблицы как новые. Используется, чтобы
+        заново построить очищенные статистику, индексы и фильтры.
+        """
+        for key, row in self.scan():
+            self._notify(key, None, self.decode(row))
+
+    def last_key(self) -> int | None:
+        """
+        Возвращает наибольший ID в таблице или None, если таблица пуста. Читается
+        только последний непустой сегмент.
+        """
+        for segment in reversed(self.segments()):
+            if rows := self._load(segment):
+                return max(rows)
+        return None
+
+    def overflowed_dictionaries(self) -> list[str]:
+        """
+        Возвращает столбцы, в словари которых добавлялись значения сверх
+        DICT_MAX_VALUES, и сбрасывает их флаги overflowed.
+        """
+        columns = [column for column, codec in self._codecs.items() if codec.overflowed]
+        for column in columns:
+            self._codecs[column].overflowed = False
+        return columns
+
+    def dictionary_size(self, column: str) -> int:
+        """Возвращает количество значений в словаре столбца."""
+        return len(self._codecs[column].values)
+
+    def collect_dictionaries(self) -> dict[str, tuple[int, list[str]] | None]:
+        """
+        Забирает новые значения словарей столбцов для записи на диск (см.
+        ColumnDictionary.collect_dirty). Словари нужно записывать раньше
+        сегментов, в которых встречаются коды новых значений.
+        """
+        return {column: codec.collect_dirty() for column, codec in self._codecs.items()}
+
+    def write_dictionaries(self, changes: dict[str, tuple[int, list[str]] | None]):
+        """Записывает на диск значения словарей, полученные из collect_dictionaries."""
+        for column, column_changes in changes.items():
+            self._codecs[column].write(column_changes)
+
+    def collect_dirty(self) -> dict[int, dict | None]:
+        """
+        Забирает изменения для записи на диск: копии изменённых сегментов, после
+        чего сегменты считаются сохранёнными. Опустевшие сегменты удаляются из
+        манифеста. Забранные сегменты не вытесняются из памяти, пока после их
+        записи не вызван release.
+
+        Returns:
+            dict[int, dict or None]: Записи изменённых сегментов {номер : записи}
+                (None - сегмент опустел и его файл нужно удалить).
+        """
+        segments = {}
+        for segment in sorted(self._dirty):
+            segments |= self._collect_segment(segment)
+        self._in_flight.update(segments)
+        return segments
+
+    def release(self, segments: Iterable[int]):
+        """
+        Разрешает вытеснять сегменты, которые были забраны collect_dirty и уже
+        записаны на диск.
+
+        Args:
+            segments (Iterable[int]): Номера записанных сегментов
+        """
+        self._in_flight.difference_update(segments)
+
+    def _collect_segment(self, segment: int) -> dict[int, dict | None]:
+        """Забирает изменения одного сегмента для записи на диск (см. collect_dirty)."""
+        rows = self._segments[segment]
+        self._dirty.discard(segment)
+
+        if rows:
+            return {segment: dict(rows)}
+
+        self._counts.pop(str(segment), None)
+        return {segment: None}
+
+    def flush(self):
+        """
+        Записывает на диск новые значения словарей, изменённые сегменты,
+        индексы, фильтры и представления. Опустевшие сегменты удаляются вместе с
+        их файлами и записью в манифесте.
+        """
+        dictionaries = self.collect_dictionaries()
+        segments = self.collect_dirty()
+        self.write_dictionaries(dictionaries)
+        write_segments(self.table_name, segments)
+        self.release(segments)
+        for structure in self.side_structures():
+            structure.flush()
+
+    def evict(self):
+        """Выгружает из памяти все сегменты, в которых нет несохранённых изменений."""
+        for segment in set(self._segments) - self._dirty - self._in_flight:
+            del self._segments[segment]
@@ -0,0 +1,321 @@
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from .constants import (
+    CSV_EXT,
+    DICT_AUTO_MAX_RATIO,
+    DICT_AUTO_MIN_ROWS,
+    DICT_DATA_TYPE_STR,
+    ID_COLUMN_NAME,
+    ID_INITIAL_VALUE,
+    IMPORT_BATCH_SIZE,
+    TABLE_COLUMNS,
+    TABLE_DICTIONARIES,
+    TRANSFER_FORMATS,
+    Bool,
+)
+from .core import (
+    check_clause,
+    check_unique,
+    filter_rows,
+    warn_overflowed_dictionaries,
+)
+from .decorators import handle_db_errors, log_time
+from .output import ROW_WRITERS, with_keys
+from .schema import TableSchema, get_schema
+from .storage import SegmentedTable
+from .utils import save_table_data
+
+
+def _get_format(filepath: str) -> str | None:
+    """
+    Определяет формат файла по расширению.
+
+    Args:
+        filepath (str): Путь к файлу
+    Returns:
+        str or None: Расширение файла (".jsonl" или ".csv") или None, если формат
+            не поддерживается.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    return ext if ext in TRANSFER_FORMATS else None
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Разбивает поток значений на списки длиной не более size."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _parse_csv_value(value: str, type_name: str | None) -> int | str | bool:
+    """
+    Преобразует значение из CSV к типу столбца. Если преобразовать не удалось,
+    возвращает строку без изменений - ошибку покажет проверка по схеме таблицы.
+
+    Args:
+        value (str): Значение из CSV
+        type_name (str or None): Тип данных столбца или None, если столбца нет
+    Returns:
+        int or str or bool: Значение в типе данных столбца.
+    """
+    match type_name:
+        case "int":
+            try:
+                return int(value)
+            except ValueError:
+                return value
+        case "bool" if value.lower() in (Bool.TRUE, Bool.FALSE):
+            return value.lower() == Bool.TRUE
+        case _:
+            return value
+
+
+def _read_jsonl(filepath: str) -> Iterator[dict | ValueError]:
+    """
+    Построчно читает записи из файла JSON Lines. Вместо строки, которая не
+    является объектом JSON, возвращается ValueError с описанием ошибки, чтобы
+    импорт остановился на этой записи.
+    """
+    with open(filepath, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ValueError(f"Некорректный JSON: {e}.")
+                continue
+
+            if isinstance(record, dict):
+                yield record
+            else:
+                yield ValueError("Запись должна быть объектом JSON.")
+
+
+def _read_csv(filepath: str, table_columns: dict) -> Iterator[dict | ValueError]:
+    """
+    Построчно читает записи из CSV-файла, приводя значения к типам столбцов.
+    Столбцы, для которых в строке не хватило значений, считаются отсутствующими;
+    вместо строки с лишними значениями возвращается ValueError.
+    """
+    with open(filepath, "r", encoding="utf-8", newline="") as file:
+        for record in csv.DictReader(file):
+            # DictReader складывает лишние значения под ключ None
+            if None in record:
+                yield ValueError("В строке больше значений, чем столбцов.")
+                continue
+
+            yield {
+                column: _parse_csv_value(value, table_columns.get(column))
+                for column, value in record.items()
+                if value is not None
+            }
+
+
+def _check_batch_unique(seen: dict[str, set], record: dict) -> bool:
+    """
+    Проверяет, что значения уникальных столбцов записи не встречались раньше в
+    той же пачке. Выводит сообщение при ошибке.
+
+    Args:
+        seen (dict[str, set]): Значения уникальных столбцов из предыдущих записей
+        record (dict): Проверяемая запись
+    """
+    for column, values in seen.items():
+        if record[column] in values:
+            print(
+                f'Ошибка: Значение "{record[column]}" повторяется в уникальном '
+                f'столбце "{column}".'
+            )
+            return False
+    return True
+
+
+def _validate_batch(
+    schema: TableSchema, table_data: SegmentedTable, batch: list[tuple]
+) -> list[dict] | None:
+    """
+    Проверяет пачку записей из файла по схеме таблицы и уникальным столбцам:
+    значения не должны повторяться ни внутри пачки, ни в таблице. Выводит
+    сообщение при первой ошибке, в том числе для записей, которые не удалось
+    прочитать из файла.
+
+    Args:
+        schema (TableSchema): Скомпилированная схема таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        batch (list[tuple]): Пары (номер записи в файле, запись или ValueError)
+    Returns:
+        list[dict] or None: Записи в порядке столбцов таблицы или None, если в
+            пачке есть некорректная запись.
+    """
+    columns = schema.data_columns
+    seen = {column: set() for column in table_data.indexes}
+    entries = []
+
+    for number, record in batch:
+        if isinstance(record, ValueError):
+            print(f"Ошибка: {record}")
+            print(f"Импорт остановлен на записи #{number}.")
+            return None
+
+        record.pop(ID_COLUMN_NAME, None)  # ID назначаются заново
+        missing = [column for column in columns if column not in record]
+
+        if missing:
+            print(f'Ошибка: Нет значения для столбца "{missing[0]}".')
+        if (
+            missing
+            or not schema.check(record)
+            or not _check_batch_unique(seen, record)
+            or not check_unique(table_data, record)
+        ):
+            print(f"Импорт остановлен на записи #{number}.")
+            return None
+
+        for column, values in seen.items():
+            values.add(record[column])
+        entries.append({column: record[column] for column in columns})
+
+    return entries
+
+
+def _add_dictionaries_by_cardinality(
+    metadata: dict, table_name: str, table_data: SegmentedTable, entries: list[dict]
+):
+    """
+    Включает словарное кодирование для строковых столбцов, в которых мало
+    различных значений. Решение принимается по первой пачке импортируемых записей.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        entries (list[dict]): Проверенные записи первой пачки
+    """
+    if len(entries) < DICT_AUTO_MIN_ROWS:
+        return
+
+    table_metadata = metadata[table_name]
+    for column, data_type in table_metadata[TABLE_COLUMNS].items():
+        if data_type != DICT_DATA_TYPE_STR:
+            continue
+        if column in table_metadata[TABLE_DICTIONARIES]:
+            continue
+
+        distinct = len({entry[column] for entry in entries})
+        if distinct <= len(entries) * DICT_AUTO_MAX_RATIO:
+            table_data.add_dictionary(column)
+            print(f'Для столбца "{column}" включено словарное кодирование.')
+
+
+@log_time
+@handle_db_errors
+def export_table(
+    metadata: dict,
+    table_name: str,
+    table_data: SegmentedTable,
+    filepath: str,
+    where_clause: dict = None,
+):
+    """
+    Выгружает записи таблицы в файл JSON Lines или CSV (формат определяется по
+    расширению). Если указано условие where_clause, выгружаются только подходящие
+    записи. Записи пишутся в файл по одной, сегменты таблицы не удерживаются в
+    памяти.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        filepath (str): Путь к файлу для выгрузки
+        where_clause (dict or None): Условия для фильтрации (если применимы)
+    """
+
+    columns = list(metadata[table_name][TABLE_COLUMNS])
+
+    where_clause = where_clause or {}
+    if not check_clause(metadata, table_name, where_clause):
+        return
+
+    if (file_format := _get_format(filepath)) is None:
+        print(f'Ошибка: Неподдерживаемый формат файла "{filepath}".')
+        return
+
+    write_records = ROW_WRITERS[TRANSFER_FORMATS[file_format]]
+    records = with_keys(filter_rows(table_data, where_clause, stream=True))
+
+    with open(filepath, "w", encoding="utf-8", newline="") as file:
+        count = write_records(file, columns, records)
+
+    print(f'Выгружено записей: {count} в файл "{filepath}".')
+
+
+@log_time
+@handle_db_errors
+def import_table(
+    metadata: dict,
+    table_name: str,
+    table_data: SegmentedTable,
+    filepath: str,
+) -> SegmentedTable | None:
+    """
+    Загружает записи из файла JSON Lines или CSV в таблицу. Записи проверяются по
+    схеме таблицы и добавляются пачками по IMPORT_BATCH_SIZE: каждая пачка сразу
+    сохраняется на диск. Значения ID из файла не используются - ключи
+    назначаются заново, как при insert. По первой пачке для строковых столбцов с
+    небольшим числом различных значений включается словарное кодирование.
+
+    Если в пачке есть некорректная запись, импорт останавливается, а уже
+    сохранённые пачки остаются в таблице.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        filepath (str): Путь к файлу для загрузки
+    Returns:
+        SegmentedTable (optional): Обновлённые данные таблицы или None, если ни
+        одна запись не была добавлена.
+    """
+
+    table_columns = metadata[table_name][TABLE_COLUMNS]
+    schema = get_schema(metadata, table_name)
+
+    if (file_format := _get_format(filepath)) is None:
+        print(f'Ошибка: Неподдерживаемый формат файла "{filepath}".')
+        return None
+
+    records = (
+        _read_csv(filepath, table_columns)
+        if file_format == CSV_EXT
+        else _read_jsonl(filepath)
+    )
+
+    last_id = table_data.last_key()
+    next_id = last_id + 1 if last_id is not None else ID_INITIAL_VALUE
+    imported = 0
+
+    for batch in _batched(enumerate(records, start=1), IMPORT_BATCH_SIZE):
+        entries = _validate_batch(schema, table_data, batch)
+        if entries is None:
+            break
+
+        if not imported:
+            _add_dictionaries_by_cardinality(metadata, table_name, table_data, entries)
+
+        for entry in entries:
+            table_data[next_id] = entry
+            next_id += 1
+
+        save_table_data(metadata, table_name, table_data)
+        table_data.evict()
+        imported += len(entries)
+
+    print(f'Загружено записей: {imported} в таблицу "{table_name}".')
+    warn_overflowed_dictionaries(table_data)
+
+    return table_data if imported else None
@@ -1,23 +1,83 @@
 import json
 import os
 
-from .constants import DB_META_FILE, DB_TABLES_DIR, JSON_EXT
+from .bloom import SegmentBloomFilter
+from .constants import (
+    DB_META_FILE,
+    DB_TABLES_DIR,
+    JSON_EXT,
+    TABLE_BLOOM,
+    TABLE_COLUMNS,
+    TABLE_DICTIONARIES,
+    TABLE_INDEXES,
+    TABLE_STATISTICS,
+    TABLE_STORAGE,
+    TABLE_UNIQUE,
+    TABLE_VIEWS,
+)
 from .decorators import handle_file_errors
+from .index import UniqueIndex
+from .stats import TableStatistics
+from .storage import (
+    SegmentedTable,
+    create_manifest,
+    remove_table_segments,
+    write_dictionary,
+)
+from .views import MaterializedView
 
 
 @handle_file_errors
+def _load_json(filepath: str) -> dict:
+    """Загружает словарь из JSON-файла. Если файл не существует, возвращает {}."""
+    with open(filepath, "r", encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
 def load_metadata(filepath: str = DB_META_FILE) -> dict:
     """
     Загружает метаданные о существующих таблицах. Если файл не существует, то
-    возвращается пустой словарь.
+    возвращается пустой словарь. Таблицы в старом формате (один файл на таблицу)
+    при загрузке переводятся на хранение сегментами, словари столбцов из
+    метаданных переносятся в файлы, а для таблиц без статистики по столбцам она
+    собирается по всем записям.
 
     Args:
         filepath (str, optional): Путь к файлу с метаданными.
     Returns:
         dict: Словарь, содержащий текущие метаданные.
     """
-    with open(filepath, "r", encoding="utf-8") as json_file:
-        return json.load(json_file)
+    metadata = _load_json(filepath)
+
+    legacy_tables = [
+        table_name
+        for table_name, table_metadata in metadata.items()
+        if TABLE_COLUMNS not in table_metadata
+        or not isinstance(table_metadata[TABLE_COLUMNS], dict)
+    ]
+    for table_name in legacy_tables:
+        metadata[table_name] = _migrate_legacy_table(table_name, metadata[table_name])
+
+    tables_with_inline_dictionaries = [
+        table_name
+        for table_name, table_metadata in metadata.items()
+        if isinstance(table_metadata.get(TABLE_DICTIONARIES), dict)
+    ]
+    for table_name in tables_with_inline_dictionaries:
+        _migrate_dictionaries(table_name, metadata[table_name])
+
+    tables_without_stats = [
+        table_name
+        for table_name, table_metadata in metadata.items()
+        if TABLE_STATISTICS not in table_metadata
+    ]
+    for table_name in tables_without_stats:
+        rebuild_statistics(metadata, table_name)
+
+    if legacy_tables or tables_with_inline_dictionaries or tables_without_stats:
+        save_metadata(metadata, filepath)
+
+    return metadata
 
 
 def save_metadata(data: dict, filepath: str = DB_META_FILE):
@@ -33,38 +93,141 @@ def save_metadata(data: dict, filepath: str = DB_META_FILE):
 
 def _create_table_data_filepath(table_name: str, datapath: str = DB_TABLES_DIR):
     """
-    Собирает полный путь к файлу с данными таблицы. Также создаёт директорию, где
-    хранятся данные таблицы, если она не существует.
+    Собирает полный путь к файлу с данными таблицы в старом формате (одним
+    файлом). Также создаёт директорию, где хранятся данные таблицы, если она
+    не существует.
     """
     os.makedirs(datapath, exist_ok=True)
     return os.path.join(datapath, table_name + JSON_EXT)
 
 
-@handle_file_errors
-def load_table_data(table_name: str) -> dict:
+def _migrate_legacy_table(table_name: str, columns: dict) -> dict:
+    """
+    Переносит данные таблицы из одного файла в сегменты и возвращает метаданные
+    таблицы в новом формате. Старый файл с данными удаляется.
+
+    Args:
+        table_name (str): Название таблицы
+        columns (dict): Схема таблицы в старом формате {столбец : тип}
+    Returns:
+        dict: Метаданные таблицы со схемой и манифестом сегментов.
+    """
+    manifest = create_manifest()
+    legacy_filepath = _create_table_data_filepath(table_name)
+
+    table_data = SegmentedTable(table_name, manifest)
+    for key, row in _load_json(legacy_filepath).items():
+        table_data[key] = row
+    table_data.flush()
+
+    if os.path.exists(legacy_filepath):
+        os.remove(legacy_filepath)
+
+    return {TABLE_COLUMNS: columns, TABLE_STORAGE: manifest, TABLE_DICTIONARIES: []}
+
+
+def _migrate_dictionaries(table_name: str, table_metadata: dict):
     """
-    Загружает данные для указанной таблицы.
+    Переносит словари столбцов, которые хранились в метаданных таблицы целиком
+    ({столбец : [значения]}), в файлы словарей. В метаданных остаётся список
+    столбцов со словарным кодированием.
 
     Args:
+        table_name (str): Название таблицы
+        table_metadata (dict): Метаданные таблицы (изменяются на месте)
+    """
+    dictionaries = table_metadata[TABLE_DICTIONARIES]
+    for column, values in dictionaries.items():
+        write_dictionary(table_name, column, 0, values)
+    table_metadata[TABLE_DICTIONARIES] = list(dictionaries)
+
+
+def load_table_data(metadata: dict, table_name: str) -> SegmentedTable:
+    """
+    Открывает данные для указанной таблицы. Записи читаются с диска по
+    сегментам только при обращении к ним. К таблице подключаются статистика
+    по столбцам, индексы уникальных столбцов, фильтры Блума и материализованные
+    представления.
+
+    Args:
+        metadata (dict): Текущие метаданные
         table_name (str): Название таблицы, данные для которой нужно получить.
     Returns:
-        dict: Словарь, содержащий все записи в таблице.
+        SegmentedTable: Отображение {ID : запись} для всех записей в таблице.
     """
-    table_data_path = _create_table_data_filepath(table_name)
+    table_metadata = metadata.get(table_name, {})
+    manifest = table_metadata.get(TABLE_STORAGE) or create_manifest()
+    dictionaries = table_metadata.setdefault(TABLE_DICTIONARIES, [])
+    table_data = SegmentedTable(table_name, manifest, dictionaries)
 
-    with open(table_data_path, "r", encoding="utf-8") as json_file:
-        return json.load(json_file)
+    if table_name in metadata:
+        statistics = TableStatistics(
+            table_metadata.setdefault(TABLE_STATISTICS, {}),
+            table_metadata[TABLE_COLUMNS],
+        )
+        table_data.subscribe(statistics.apply)
+
+        for column in table_metadata.get(TABLE_UNIQUE, []):
+            state = table_metadata.setdefault(TABLE_INDEXES, {}).setdefault(column, {})
+            table_data.attach_index(
+                UniqueIndex(table_name, column, state, len(table_data))
+            )
 
+        for column in table_metadata.get(TABLE_BLOOM, []):
+            table_data.attach_filter(SegmentBloomFilter(table_name, column, manifest))
 
-def save_table_data(table_name: str, data: dict):
+        for view_name, definition in table_metadata.get(TABLE_VIEWS, {}).items():
+            table_data.attach_view(
+                MaterializedView(table_name, view_name, definition, manifest)
+            )
+
+    return table_data
+
+
+def rebuild_statistics(metadata: dict, table_name: str):
     """
-    Сохраняет данные для указанной таблицы.
+    Собирает статистику по столбцам таблицы заново, читая все записи по одному
+    сегменту.
 
     Args:
+        metadata (dict): Текущие метаданные
+        table_name (str): Название таблицы
+    """
+    table_metadata = metadata[table_name]
+    table_data = SegmentedTable(
+        table_name,
+        table_metadata[TABLE_STORAGE],
+        table_metadata.setdefault(TABLE_DICTIONARIES, []),
+    )
+    statistics = TableStatistics(
+        table_metadata.setdefault(TABLE_STATISTICS, {}),
+        table_metadata[TABLE_COLUMNS],
+    )
+    statistics.rebuild((key, table_data.decode(row)) for key, row in table_data.scan())
+
+
+def save_table_data(metadata: dict, table_name: str, data: SegmentedTable):
+    """
+    Сохраняет изменённые сегменты указанной таблицы и обновлённый манифест.
+
+    Args:
+        metadata (dict): Текущие метаданные (содержат манифест сегментов)
         table_name (str): Название таблицы, данные для которой нужно сохранить.
-        data (dict): Словарь, который содержит все записи в таблице.
+        data (SegmentedTable): Данные таблицы.
     """
-    table_data_path = _create_table_data_filepath(table_name)
+    data.flush()
+    save_metadata(metadata)
 
-    with open(table_data_path, "w", encoding="utf-8") as json_file:
-        json.dump(data, json_file, ensure_ascii=False, indent=2)
+
+def remove_table_data(table_name: str):
+    """
+    Удаляет все данные указанной таблицы с диска.
+
+    Args:
+        table_name (str): Название таблицы, данные которой нужно удалить.
+    """
+    remove_table_segments(table_name)
+
+    legacy_filepath = _create_table_data_filepath(table_name)
+    if os.path.exists(legacy_filepath):
+        os.remove(legacy_filepath)
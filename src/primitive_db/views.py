@@ -0,0 +1,508 @@
+import json
+import os
+import shutil
+import sys
+from collections import OrderedDict
+
+from .constants import (
+    BUFFER_POOL_SIZE,
+    DB_TABLES_DIR,
+    ID_COLUMN_NAME,
+    ID_INITIAL_VALUE,
+    INCREMENTAL_AGGREGATES,
+    JSON_EXT,
+    SEGMENT_SIZE_KEY,
+    TABLE_COLUMNS,
+    TABLE_STORAGE,
+    TABLE_VIEWS,
+    VIEW_AGGREGATES,
+    VIEW_DIR,
+    VIEW_GROUP_BY,
+    VIEW_GROUPS_PART,
+    VIEW_WHERE,
+    Aggregate,
+    OutputFormat,
+)
+from .core import (
+    check_aggregates,
+    check_clause,
+    filter_rows,
+    finalize_aggregates,
+    initial_aggregate_state,
+)
+from .decorators import handle_db_errors, handle_file_errors, log_time
+from .output import ROW_WRITERS
+from .storage import SegmentedTable
+
+
+def _create_view_dirpath(
+    table_name: str, view_name: str, datapath: str = DB_TABLES_DIR
+) -> str:
+    """Собирает путь к директории, в которой лежат части результата представления."""
+    return os.path.join(datapath, table_name, VIEW_DIR, view_name)
+
+
+def _create_part_filepath(table_name: str, view_name: str, part: str) -> str:
+    """
+    Собирает полный путь к файлу части результата представления. Также создаёт
+    директорию представления, если она не существует.
+    """
+    view_dirpath = _create_view_dirpath(table_name, view_name)
+    os.makedirs(view_dirpath, exist_ok=True)
+    return os.path.join(view_dirpath, part + JSON_EXT)
+
+
+def _create_legacy_view_filepath(
+    table_name: str, view_name: str, datapath: str = DB_TABLES_DIR
+) -> str:
+    """Собирает путь к файлу результата представления в старом формате."""
+    return os.path.join(datapath, table_name, VIEW_DIR, view_name + JSON_EXT)
+
+
+@handle_file_errors
+def _load_json(filepath: str) -> dict:
+    """Загружает словарь из JSON-файла. Если файл не существует, возвращает {}."""
+    with open(filepath, "r", encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
+def load_view_part(table_name: str, view_name: str, part: str) -> dict:
+    """
+    Загружает одну часть сохранённого результата представления.
+
+    Args:
+        table_name (str): Название таблицы
+        view_name (str): Название представления
+        part (str): Номер сегмента таблицы или VIEW_GROUPS_PART
+    Returns:
+        dict: Часть результата {ключ : запись или состояние агрегатов}.
+    """
+    filepath = _create_part_filepath(table_name, view_name, part)
+    return {json.loads(key): value for key, value in _load_json(filepath).items()}
+
+
+def write_view_parts(table_name: str, view_name: str, parts: dict[str, dict]):
+    """
+    Записывает части результата представления на диск. Файлы опустевших частей
+    удаляются.
+
+    Args:
+        table_name (str): Название таблицы
+        view_name (str): Название представления
+        parts (dict[str, dict]): Части {название : содержимое}
+    """
+    for part, result in parts.items():
+        filepath = _create_part_filepath(table_name, view_name, part)
+        if result:
+            with open(filepath, "w", encoding="utf-8") as json_file:
+                json_file.write(
+                    json.dumps(
+                        {json.dumps(key): value for key, value in result.items()},
+                        ensure_ascii=False,
+                    )
+                )
+        elif os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def remove_view(table_name: str, view_name: str):
+    """Удаляет с диска результат представления (в том числе в старом формате)."""
+    shutil.rmtree(_create_view_dirpath(table_name, view_name), ignore_errors=True)
+    try:
+        os.remove(_create_legacy_view_filepath(table_name, view_name))
+    except FileNotFoundError:
+        pass
+
+
+def find_view(metadata: dict, view_name: str) -> str | None:
+    """
+    Ищет таблицу, по которой построено представление.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        view_name (str): Название представления
+    Returns:
+        str or None: Название таблицы или None, если представления нет.
+    """
+    for table_name, table_metadata in metadata.items():
+        if view_name in table_metadata.get(TABLE_VIEWS, {}):
+            return table_name
+    return None
+
+
+class MaterializedView:
+    """
+    Материализованное представление: сохранённый результат запроса
+    "select from <таблица> [where ...]" или запроса с агрегатами count, sum и
+    avg (с группировкой или без). Результат не пересчитывается по таблице, а
+    обновляется по каждому изменению записи (apply): запись добавляется,
+    заменяется или убирается, а к состоянию агрегатов её группы прибавляются или
+    вычитаются её значения. Поэтому чтение представления стоит столько же,
+    сколько вывод результата, независимо от размера таблицы.
+
+    Результат хранится частями, и изменение записи читает и перезаписывает
+    только свою часть. Записи разложены по сегментам таблицы: часть с номером
+    сегмента содержит подходящие записи из него. Для агрегатов хранится одна
+    часть VIEW_GROUPS_PART с состоянием групп: количество записей и накопленные
+    значения функций (для avg - сумма и количество).
+
+    Части загружаются при первом обращении; в памяти держится не больше
+    BUFFER_POOL_SIZE частей без несохранённых изменений, как сегментов в пуле
+    буферов таблицы.
+    """
+
+    def __init__(self, table_name: str, name: str, definition: dict, manifest: dict):
+        """
+        Args:
+            table_name (str): Название таблицы
+            name (str): Название представления
+            definition (dict): Запрос представления из метаданных таблицы
+            manifest (dict): Манифест сегментов таблицы
+        """
+        self.table_name = table_name
+        self.name = name
+        self._where = definition[VIEW_WHERE]
+        aggregates = definition[VIEW_AGGREGATES]
+        self.aggregates = [tuple(pair) for pair in aggregates] if aggregates else None
+        self.group_by = definition[VIEW_GROUP_BY]
+        self._segment_size = manifest[SEGMENT_SIZE_KEY]
+        self._parts = OrderedDict()
+        self._dirty = set()
+        # Копии частей, забранные collect_dirty, пока их запись на диск не
+        # закончилась: вытесненная часть загружается из них, а не с диска
+        self._unwritten = {}
+        self._migrate_legacy_result()
+
+    def _migrate_legacy_result(self):
+        """
+        Раскладывает по частям результат, сохранённый в старом формате (одним
+        файлом data/<таблица>/views/<представление>.json), и удаляет этот файл.
+        """
+        legacy_filepath = _create_legacy_view_filepath(self.table_name, self.name)
+        if not os.path.exists(legacy_filepath):
+            return
+
+        for key, value in _load_json(legacy_filepath).items():
+            key = json.loads(key)
+            part = self._part_of(key)
+            self._load(part)[key] = value
+            self._dirty.add(part)
+
+        self.flush()
+        os.remove(legacy_filepath)
+
+    def _part_of(self, key: int) -> str:
+        """Возвращает название части, в которой хранится запись с этим ID."""
+        if self.aggregates is not None:
+            return VIEW_GROUPS_PART
+        return str((key - ID_INITIAL_VALUE) // self._segment_size)
+
+    def _part_names(self) -> set[str]:
+        """Возвращает названия всех частей: сохранённых и ещё не записанных."""
+        view_dirpath = _create_view_dirpath(self.table_name, self.name)
+        names = {
+            os.path.splitext(filename)[0]
+            for filename in (
+                os.listdir(view_dirpath) if os.path.isdir(view_dirpath) else []
+            )
+        }
+        return names | set(self._parts) | set(self._unwritten)
+
+    def _load(self, part: str) -> dict:
+        """Возвращает часть результата, загружая её с диска при первом обращении."""
+        if part in self._parts:
+            self._parts.move_to_end(part)
+            return self._parts[part]
+
+        unwritten = self._unwritten
+        self._parts[part] = (
+            dict(unwritten[part])
+            if part in unwritten
+            else load_view_part(self.table_name, self.name, part)
+        )
+        self._trim()
+        return self._parts[part]
+
+    def _trim(self):
+        """
+        Вытесняет давно не использованные части без несохранённых изменений,
+        пока их больше BUFFER_POOL_SIZE. Последняя загруженная часть не
+        вытесняется.
+        """
+        excess = len(self._parts) - BUFFER_POOL_SIZE
+        for part in list(self._parts)[:-1]:
+            if excess <= 0:
+                break
+            if part not in self._dirty:
+                del self._parts[part]
+                excess -= 1
+
+    def _matches(self, key: int, row: dict) -> bool:
+        """Проверяет, удовлетворяет ли запись условию представления."""
+        return all(
+            (key if column == ID_COLUMN_NAME else row[column]) == value
+            for column, value in self._where.items()
+        )
+
+    def _change_group(self, key: int, row: dict, sign: int):
+        """Прибавляет (sign = 1) или вычитает (sign = -1) запись из её группы."""
+        if self.group_by is None:
+            group = None
+        else:
+            group = key if self.group_by == ID_COLUMN_NAME else row[self.group_by]
+
+        result = self._load(VIEW_GROUPS_PART)
+        state = result.setdefault(group, [0, *initial_aggregate_state(self.aggregates)])
+        state[0] += sign
+
+        for i, (func, column) in enumerate(self.aggregates, start=1):
+            value = key if column == ID_COLUMN_NAME else row.get(column)
+            match func:
+                case Aggregate.COUNT:
+                    state[i] += sign
+                case Aggregate.SUM:
+                    state[i] += sign * value
+                case Aggregate.AVG:
+                    state[i][0] += sign * value
+                    state[i][1] += sign
+
+        if state[0] == 0:
+            del result[group]
+
+    def apply(self, key: int, old_row: dict | None, new_row: dict | None):
+        """
+        Учитывает изменение записи (см. SegmentedTable.subscribe). Если ни
+        старая, ни новая запись не удовлетворяют условию, результат не читается;
+        иначе читается только часть с записью или состоянием групп.
+        """
+        old_matches = old_row is not None and self._matches(key, old_row)
+        new_matches = new_row is not None and self._matches(key, new_row)
+        if not old_matches and not new_matches:
+            return
+
+        part = self._part_of(key)
+        if self.aggregates is None:
+            if new_matches:
+                self._load(part)[key] = dict(new_row)
+            else:
+                del self._load(part)[key]
+        else:
+            if old_matches:
+                self._change_group(key, old_row, -1)
+            if new_matches:
+                self._change_group(key, new_row, 1)
+
+        self._dirty.add(part)
+
+    def rows(self, columns: list[str]) -> list[list]:
+        """
+        Возвращает строки результата: записи по возрастанию ID или значения
+        агрегатов (с группой в первом столбце) по возрастанию группы.
+
+        Args:
+            columns (list[str]): Столбцы таблицы (для представления с записями)
+        """
+        if self.aggregates is None:
+            rows = []
+            # Части соответствуют диапазонам ID, поэтому обходятся по порядку
+            for part in sorted(self._part_names(), key=int):
+                result = self._load(part)
+                rows.extend(
+                    [
+                        key if column == ID_COLUMN_NAME else result[key][column]
+                        for column in columns
+                    ]
+                    for key in sorted(result)
+                )
+            return rows
+
+        result = self._load(VIEW_GROUPS_PART)
+        if self.group_by is None:
+            state = result.get(None, [0, *initial_aggregate_state(self.aggregates)])
+            return [finalize_aggregates(state[1:], self.aggregates)]
+
+        return [
+            [group, *finalize_aggregates(state[1:], self.aggregates)]
+            for group, state in sorted(result.items())
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(self._load(part)) for part in self._part_names())
+
+    def clear(self):
+        """Очищает результат вместе с файлами частей."""
+        remove_view(self.table_name, self.name)
+        self._parts.clear()
+        self._dirty.clear()
+        self._unwritten = {}
+
+    def collect_dirty(self) -> dict[str, dict]:
+        """
+        Забирает изменённые части для записи на диск, после чего части
+        считаются сохранёнными и могут вытесняться из памяти.
+
+        Returns:
+            dict[str, dict]: Копии изменённых частей {название : содержимое}.
+        """
+        parts = {part: dict(self._parts[part]) for part in self._dirty}
+        self._unwritten = parts
+        self._dirty.clear()
+        self._trim()
+        return parts
+
+    def write(self, parts: dict[str, dict]):
+        """Записывает на диск части, полученные из collect_dirty."""
+        write_view_parts(self.table_name, self.name, parts)
+        if self._unwritten is parts:
+            self._unwritten = {}
+
+    def flush(self):
+        """Записывает на диск изменённые части результата."""
+        self.write(self.collect_dirty())
+
+
+@handle_db_errors
+def create_view(
+    metadata: dict,
+    view_name: str,
+    table_name: str,
+    table_data: SegmentedTable,
+    aggregates: list[tuple] | None = None,
+    where_clause: dict | None = None,
+    group_by: str | None = None,
+) -> dict | None:
+    """
+    Создаёт материализованное представление по таблице: выполняет запрос один
+    раз и сохраняет результат, который дальше обновляется при каждом изменении
+    записей таблицы.
+
+    Выводит ошибку, если:
+    - таблица или представление с таким именем уже существует
+    - условие или агрегаты не соответствуют схеме таблицы
+    - указана функция min или max (их нельзя обновлять при удалении записей)
+
+    Args:
+        metadata (dict): Текущие метаданные
+        view_name (str): Название представления
+        table_name (str): Название таблицы
+        table_data (SegmentedTable): Текущие данные таблицы
+        aggregates (list[tuple] or None): Пары (функция, столбец) или None для
+            представления с записями
+        where_clause (dict or None): Условия для фильтрации (если применимы)
+        group_by (str or None): Столбец для группировки
+    Returns:
+        dict (optional): Обновлённые метаданные или None, если представление не
+        было создано.
+    """
+
+    if view_name in metadata or find_view(metadata, view_name) is not None:
+        print(f'Ошибка: Таблица или представление "{view_name}" уже существует.')
+        return None
+
+    table_metadata = metadata[table_name]
+    where_clause = where_clause or {}
+    if not check_clause(metadata, table_name, where_clause):
+        return None
+
+    if aggregates is not None:
+        if not check_aggregates(metadata, table_name, aggregates, group_by):
+            return None
+        for func, _ in aggregates:
+            if func not in INCREMENTAL_AGGREGATES:
+                print(f"Ошибка: Функция {func} не поддерживается в представлениях.")
+                return None
+
+    definition = {
+        VIEW_WHERE: where_clause,
+        VIEW_AGGREGATES: aggregates,
+        VIEW_GROUP_BY: group_by,
+    }
+    view = MaterializedView(
+        table_name, view_name, definition, table_metadata[TABLE_STORAGE]
+    )
+    view.clear()
+    for key, data in filter_rows(table_data, where_clause, stream=True):
+        view.apply(key, None, data)
+
+    table_metadata.setdefault(TABLE_VIEWS, {})[view_name] = definition
+    table_data.attach_view(view)
+
+    print(
+        f'Представление "{view_name}" по таблице "{table_name}" успешно создано '
+        f"(строк: {len(view)})."
+    )
+
+    return metadata
+
+
+def drop_view(metadata: dict, view_name: str) -> dict | None:
+    """
+    Удаляет представление из метаданных таблицы вместе с его результатом.
+    Если представления не существует, выводит ошибку.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        view_name (str): Название представления
+    Returns:
+        dict (optional): Обновлённые метаданные или None, если представление не
+        было удалено.
+    """
+
+    table_name = find_view(metadata, view_name)
+    if table_name is None:
+        print(f'Ошибка: Представление "{view_name}" не существует.')
+        return None
+
+    del metadata[table_name][TABLE_VIEWS][view_name]
+    remove_view(table_name, view_name)
+    print(f'Представление "{view_name}" успешно удалено.')
+
+    return metadata
+
+
+@log_time
+@handle_db_errors
+def select_view(
+    metadata: dict,
+    view_name: str,
+    table_data: SegmentedTable,
+    where_clause: dict | None = None,
+    output_format: str = OutputFormat.TABLE,
+):
+    """
+    Выводит сохранённый результат представления. Таблица не читается.
+
+    Args:
+        metadata (dict): Текущие метаданные
+        view_name (str): Название представления
+        table_data (SegmentedTable): Данные таблицы, по которой построено
+            представление
+        where_clause (dict or None): Условие (для представлений не поддерживается)
+        output_format (str, optional): Формат вывода (table | tsv | jsonl | csv)
+    """
+
+    if where_clause:
+        print("Ошибка: Условие where для представлений не поддерживается.")
+        return
+
+    view = table_data.views[view_name]
+    if view.aggregates is None:
+        columns = list(metadata[view.table_name][TABLE_COLUMNS])
+    else:
+        columns = [f"{func}({column})" for func, column in view.aggregates]
+        if view.group_by is not None:
+            columns.insert(0, view.group_by)
+
+    rows = view.rows(columns)
+
+    if output_format in ROW_WRITERS:
+        records = (dict(zip(columns, row)) for row in rows)
+        ROW_WRITERS[output_format](sys.stdout, columns, records)
+        return
+
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = columns
+    table.add_rows(rows)
+    print(table)
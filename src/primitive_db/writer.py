@@ -0,0 +1,174 @@
+import copy
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .constants import WRITE_BEHIND_INTERVAL, WRITE_BEHIND_MAX_PENDING
+from .storage import SegmentedTable, write_segments
+from .utils import load_metadata, load_table_data, save_metadata
+
+
+class WriteBehind:
+    """
+    Отложенная запись изменений на диск (write-behind). Метаданные и открытые
+    таблицы хранятся в памяти между командами, изменения записей применяются
+    только к ним, а фоновый поток раз в interval секунд (или сразу после
+    max_pending изменённых записей) записывает все изменённые таблицы за один
+    раз.
+
+    Команды работают с состоянием под блокировкой lock. Запись на диск идёт
+    под отдельной блокировкой: под lock только снимается копия изменений,
+    поэтому команды не ждут, пока файлы записываются.
+    """
+
+    def __init__(
+        self,
+        interval: float = WRITE_BEHIND_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+    ):
+        """
+        Args:
+            interval (float, optional): Наибольшая задержка записи в секундах
+            max_pending (int, optional): Количество изменённых записей, после
+                которого запись начинается, не дожидаясь interval
+        """
+        self.metadata = load_metadata()
+        self.lock = threading.RLock()
+
+        self._interval = interval
+        self._max_pending = max_pending
+        # Порядок блокировок всегда _write_lock -> lock: так копии изменений
+        # записываются на диск в том же порядке, в котором были сняты.
+        self._write_lock = threading.Lock()
+        self._changed = threading.Condition(self.lock)
+        self._tables = {}
+        self._dirty = set()
+        self._pending = 0
+        self._stopped = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def open_table(self, table_name: str) -> SegmentedTable:
+        """
+        Возвращает данные таблицы. Таблица открывается один раз и остаётся в
+        памяти вместе с несохранёнными изменениями.
+
+        Args:
+            table_name (str): Название таблицы
+        Returns:
+            SegmentedTable: Данные таблицы.
+        """
+        if (table_data := self._tables.get(table_name)) is None:
+            table_data = load_table_data(self.metadata, table_name)
+            # Изменённые сегменты записывает только фоновый поток, иначе запись при
+            # вытеснении из пула могла бы быть перезаписана более старой копией
+            table_data.write_back = False
+            table_data.subscribe(self._count_change)
+            self._tables[table_name] = table_data
+        return table_data
+
+    def _count_change(self, key: int, old_row: dict | None, new_row: dict | None):
+        """Считает изменённые записи и будит фоновый поток при превышении порога."""
+        self._pending += 1
+        if self._pending >= self._max_pending:
+            self._changed.notify()
+
+    def mark_dirty(self, table_name: str):
+        """
+        Отмечает таблицу как изменённую: она будет записана на диск фоновым
+        потоком вместе с метаданными.
+
+        Args:
+            table_name (str): Название таблицы
+        """
+        with self.lock:
+            self._dirty.add(table_name)
+
+    def _collect(self) -> tuple[list, list, dict | None]:
+        """
+        Снимает копию изменений таблиц, их словарей, индексов и фильтров и
+        метаданных (под lock).
+        """
+        segments = []
+        structures = []
+        for table_name in self._dirty & self._tables.keys():
+            table_data = self._tables[table_name]
+            segments.append(
+                (
+                    table_data,
+                    table_data.collect_dictionaries(),
+                    table_data.collect_dirty(),
+                )
+            )
+            structures += [
+                (structure, structure.collect_dirty())
+                for structure in table_data.side_structures()
+            ]
+        metadata = copy.deepcopy(self.metadata) if self._dirty else None
+
+        self._dirty.clear()
+        self._pending = 0
+        return segments, structures, metadata
+
+    def _write_pending(self):
+        """Записывает снятую копию изменений на диск (под _write_lock)."""
+        with self.lock:
+            segments, structures, metadata = self._collect()
+
+        # Словари записываются раньше сегментов с кодами их новых значений
+        for table_data, dictionaries, table_segments in segments:
+            table_data.write_dictionaries(dictionaries)
+            write_segments(table_data.table_name, table_segments)
+        for structure, changes in structures:
+            structure.write(changes)
+        if metadata is not None:
+            save_metadata(metadata)
+
+        # Записанные сегменты снова можно вытеснять из пула
+        with self.lock:
+            for table_data, _, table_segments in segments:
+                table_data.release(table_segments)
+
+    def flush(self):
+        """
+        Записывает на диск все изменения и дожидается окончания записи. Нельзя
+        вызывать под lock (порядок блокировок _write_lock -> lock).
+        """
+        with self._write_lock:
+            self._write_pending()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Выполняет блок, который пишет на диск в обход фонового потока (создание
+        и удаление таблиц, импорт): до и после блока все изменения записываются,
+        а открытые таблицы закрываются.
+        """
+        with self._write_lock:
+            self._write_pending()
+            with self.lock:
+                yield
+                self._write_pending()
+                self._tables.clear()
+
+    def _run(self):
+        """Цикл фонового потока: ждёт interval или порога изменений и пишет."""
+        while not self._stopped:
+            with self._changed:
+                self._changed.wait_for(
+                    lambda: self._stopped or self._pending >= self._max_pending,
+                    timeout=self._interval,
+                )
+            self.flush()
+
+    def close(self):
+        """Останавливает фоновый поток и записывает оставшиеся изменения."""
+        with self._changed:
+            self._stopped = True
+            self._changed.notify()
+
+        self._thread.join()
+        self.flush()